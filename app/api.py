@@ -1,8 +1,25 @@
 from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, List, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+import logging
 import os
+import threading
+import time
+
+import numpy as np
+import orjson
+
+try:
+    import msgspec
+
+    MSGSPEC_AVAILABLE = True
+except Exception:
+    MSGSPEC_AVAILABLE = False
 
 from app.services import DataManager, ZerodhaService, ZerodhaCredentials
 from app.schemas import OHLCVOut
@@ -11,10 +28,116 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _orjson_default(obj: Any):
+    # Fallback for types orjson does not handle natively (pd.Timestamp, Decimal)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class OHLCVResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC,
+            default=_orjson_default,
+        )
+
+
+if MSGSPEC_AVAILABLE:
+    _msgspec_encode = msgspec.json.Encoder(enc_hook=_orjson_default).encode
+
+
+def _render_bars(payload: Any, orient: str) -> bytes:
+    # msgspec has the fastest typed-JSON encoder for record lists; the split
+    # orient stays on orjson for its native numpy-array serialization.
+    # No OPT_NAIVE_UTC: the DB timestamps are naive IST, and the records
+    # path (pd.Timestamp via the default hook) emits them without an
+    # offset, so stamping +00:00 onto the split arrays would mislabel the
+    # same instants.
+    if orient == 'records' and MSGSPEC_AVAILABLE:
+        return _msgspec_encode(payload)
+    return orjson.dumps(
+        payload,
+        option=orjson.OPT_SERIALIZE_NUMPY,
+        default=_orjson_default,
+    )
+
+
+# TTL cache for serialized response bytes, mirroring DataManager's in-process
+# cache: repeated /latest hits within the TTL skip both the DB and orjson.
+_response_cache: dict = {}
+_response_cache_lock = threading.Lock()
+LATEST_CACHE_TTL = 60.0
+
+
+def _cached_response(key: str, ttl: float) -> Optional[bytes]:
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry and (time.monotonic() - entry[0]) < ttl:
+            return entry[1]
+        if entry:
+            del _response_cache[key]
+    return None
+
+
+def _store_response(key: str, body: bytes):
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), body)
+        if len(_response_cache) > 512:
+            oldest = min(_response_cache, key=lambda k: _response_cache[k][0])
+            _response_cache.pop(oldest, None)
+
+
+def _invalidate_latest_cache(symbols: Optional[List[str]] = None):
+    with _response_cache_lock:
+        stale = [
+            k for k in _response_cache
+            if k.startswith('latest:') and (symbols is None or k.split(':')[1] in symbols)
+        ]
+        for k in stale:
+            del _response_cache[k]
+
+
+def _render_symbol_bars(fetch, symbol: str, orient: str, *args) -> bytes:
+    # Runs in the threadpool: both the blocking fetch and the (potentially
+    # large) serialization stay off the event loop. No pydantic validation is
+    # re-run on these trusted DB rows.
+    df = fetch(symbol, *args)
+    return _render_bars(_bars_payload(df, symbol, orient), orient)
+
+
+def _bars_payload(df, symbol: str, orient: str):
+    if orient == 'split':
+        # Columnar layout: orjson walks the numpy arrays directly, so no
+        # per-row dicts/Timestamps are materialized (matters at count=5000).
+        # Object/category columns (sector) must go through tolist():
+        # OPT_SERIALIZE_NUMPY has no object-dtype support and would hand
+        # the whole ndarray to the default hook, which raises.
+        return {
+            'symbol': symbol,
+            'data_source': 'db',
+            'columns': list(df.columns),
+            'data': [
+                df[col].tolist() if df[col].dtype.kind == 'O' else df[col].to_numpy()
+                for col in df.columns
+            ],
+        }
+    return df.assign(symbol=symbol, data_source='db').to_dict(orient='records')
+
+# Singletons: constructing a DataManager re-reads constituents metadata and
+# spawns a cache-cleanup thread, so don't pay that per request.
+@lru_cache(maxsize=1)
 def get_data_manager() -> DataManager:
     return DataManager({'data_validation_enabled': True, 'export_formats': ['csv', 'json', 'parquet']})
 
 
+@lru_cache(maxsize=1)
 def get_zerodha_service() -> Optional[ZerodhaService]:
     api_key = os.getenv('ZERODHA_API_KEY')
     api_secret = os.getenv('ZERODHA_API_SECRET')
@@ -23,192 +146,162 @@ def get_zerodha_service() -> Optional[ZerodhaService]:
     return ZerodhaService(ZerodhaCredentials(api_key=api_key, api_secret=api_secret, access_token=os.getenv('ZERODHA_ACCESS_TOKEN')))
 
 
-app = FastAPI(title="Nifty50 Data API")
+app = FastAPI(title="Nifty50 Data API", default_response_class=ORJSONResponse)
+
+
+@app.on_event("startup")
+async def warm_dependencies():
+    # Build the DataManager singleton (and its pre-serialized symbols payload)
+    # before the first request arrives.
+    await run_in_threadpool(get_data_manager)
 
 
 @app.get("/health")
-def health(dm: DataManager = Depends(get_data_manager)):
-    return dm.health_check()
+async def health(dm: DataManager = Depends(get_data_manager)):
+    return await run_in_threadpool(dm.health_check)
 
 
 @app.get("/symbols")
-def symbols(dm: DataManager = Depends(get_data_manager)):
-    return dm.symbols_list
+async def symbols(dm: DataManager = Depends(get_data_manager)):
+    # Serialized once at DataManager construction; served as-is here
+    return Response(dm.symbols_json, media_type='application/json')
 
 
+# response_model is kept for OpenAPI docs only; returning a Response directly
+# skips the per-row jsonable_encoder pass on these hot paths.
 @app.get("/latest/{symbol}", response_model=List[OHLCVOut])
-def latest(symbol: str, count: int = Query(100, ge=1, le=5000), dm: DataManager = Depends(get_data_manager)):
-    df = dm.get_latest_bars(symbol, count)
-    return df.assign(symbol=symbol, data_source='db').to_dict(orient='records')
+async def latest(symbol: str, count: int = Query(100, ge=1, le=5000), orient: str = Query('records', pattern='^(records|split)$'), dm: DataManager = Depends(get_data_manager)):
+    cache_key = f"latest:{symbol}:{count}:{orient}"
+    body = _cached_response(cache_key, LATEST_CACHE_TTL)
+    if body is None:
+        body = await run_in_threadpool(_render_symbol_bars, dm.get_latest_bars, symbol, orient, count)
+        _store_response(cache_key, body)
+    return Response(body, media_type='application/json')
 
 
 @app.get("/historical/{symbol}", response_model=List[OHLCVOut])
-def historical(symbol: str, start: str, end: str, dm: DataManager = Depends(get_data_manager)):
-
-    try:
-        start_dt = datetime.fromisoformat(start)
-        end_dt = datetime.fromisoformat(end)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO 8601.")
-
-    df = dm.get_historical_data(symbol, start_dt, end_dt)
-    return df.assign(symbol=symbol, data_source='db').to_dict(orient='records')
+async def historical(symbol: str, start: datetime, end: datetime, orient: str = Query('records', pattern='^(records|split)$'), dm: DataManager = Depends(get_data_manager)):
+    # start/end are parsed and validated once by pydantic (ISO 8601)
+    body = await run_in_threadpool(_render_symbol_bars, dm.get_historical_data, symbol, orient, start, end)
+    return Response(body, media_type='application/json')
 
 
 @app.post("/export")
-def export(symbols: List[str], start: str, end: str, fmt: str = 'csv', dm: DataManager = Depends(get_data_manager)):
-    try:
-        start_dt = datetime.fromisoformat(start)
-        end_dt = datetime.fromisoformat(end)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO 8601.")
-    path = dm.export_data(symbols, start_dt, end_dt, fmt)
-    return {"file_path": path}
+async def export(symbols: List[str], start: datetime, end: datetime, fmt: str = 'csv', download: bool = False, dm: DataManager = Depends(get_data_manager)):
+    start_dt, end_dt = start, end
+    if download:
+        # Stream chunks straight to the client instead of building the whole
+        # export in memory / on disk first.
+        if fmt != 'csv':
+            raise HTTPException(status_code=400, detail="Streaming download supports fmt=csv only")
+        return StreamingResponse(
+            dm.iter_export_csv(symbols, start_dt, end_dt),
+            media_type='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=export.csv'},
+        )
+    path = await run_in_threadpool(dm.export_data, symbols, start_dt, end_dt, fmt)
+    return OHLCVResponse({"file_path": path})
 
 
 @app.post("/live/update")
-def live_update(symbols: Optional[List[str]] = None, dm: DataManager = Depends(get_data_manager), zs: Optional[ZerodhaService] = Depends(get_zerodha_service)):
+async def live_update(symbols: Optional[List[str]] = None, dm: DataManager = Depends(get_data_manager), zs: Optional[ZerodhaService] = Depends(get_zerodha_service)):
     if zs is None:
         raise HTTPException(status_code=400, detail="Zerodha credentials not configured")
-    results = dm.fetch_and_store_live_data(zs, symbols)
-    return {"updated": sum(1 for v in results.values() if v), "details": results}
+    results = await run_in_threadpool(dm.fetch_and_store_live_data, zs, symbols)
+    updated = [s for s, ok in results.items() if ok]
+    if updated:
+        _invalidate_latest_cache(updated)
+    return {"updated": len(updated), "details": results}
 
 
 class HistoricalIngestBody(BaseModel):
     symbols: List[str]
-    start: str
-    end: str
+    start: date
+    end: date
     interval: str = "minute"
     validate_only: bool = False  # New parameter for validation-only mode
 
 
 @app.post("/ingest/historical")
-def ingest_historical(payload: HistoricalIngestBody, dm: DataManager = Depends(get_data_manager), zs: Optional[ZerodhaService] = Depends(get_zerodha_service)):
-    print(f"🔍 API RECEIVED REQUEST: validate_only={payload.validate_only}")
+async def ingest_historical(payload: HistoricalIngestBody, dm: DataManager = Depends(get_data_manager), zs: Optional[ZerodhaService] = Depends(get_zerodha_service)):
+    logger.debug("ingest request received: validate_only=%s", payload.validate_only)
     if zs is None:
         raise HTTPException(status_code=400, detail="Zerodha credentials not configured")
-    try:
-        start_dt = datetime.strptime(payload.start, "%Y-%m-%d")
-        end_dt = datetime.strptime(payload.end, "%Y-%m-%d")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
-    if end_dt < start_dt:
+    return await run_in_threadpool(_run_historical_ingest, payload, dm, zs)
+
+
+def _run_historical_ingest(payload: HistoricalIngestBody, dm: DataManager, zs: ZerodhaService):
+    if payload.end < payload.start:
         raise HTTPException(status_code=400, detail="end must be >= start")
+    start_dt = datetime.combine(payload.start, datetime.min.time())
+    end_dt = datetime.combine(payload.end, datetime.min.time())
 
     details = {}
     total_rows = 0
     validation_errors = []
     validation_warnings = []
-    cumulative_quality_scores = []  # Store all quality scores for cumulative calculation
-    total_weighted_score = 0.0  # For weighted average calculation
+    score_records = []  # (quality_score, row_count) per validated symbol
     all_timestamp_details = []  # Store timestamp details for Excel export
-    
+
+    # Fetch symbols concurrently -- each fetch is a blocking HTTP round-trip to
+    # Kite, so serial iteration costs N x RTT. The service fans out across a
+    # thread pool under its own rate limiter; validation and DB writes stay on
+    # this thread to respect the SQLAlchemy pool_size in database.py.
+    fetched = zs.fetch_historical_data_many(payload.symbols, start_dt, end_dt, interval=payload.interval)
+
     for symbol in payload.symbols:
-        df = zs.fetch_historical_data(symbol, start_dt, end_dt, interval=payload.interval)
+        df = fetched[symbol]
         if df.empty:
             details[symbol] = {"rows": 0, "stored": False, "validation_passed": True}
             continue
-            
+
         # Validate data before storing
-        print(f"🔍 API: About to validate {symbol}, validate_only={payload.validate_only}")
+        logger.debug("validating %s: validate_only=%s", symbol, payload.validate_only)
         is_valid, issues, quality_score, timestamp_details = dm.validate_data_quality(df, symbol, skip_logging=payload.validate_only)
-        
+
+        score_records.append((quality_score, len(df)))
+        if timestamp_details:
+            timestamp_details['symbol'] = symbol
+            all_timestamp_details.append(timestamp_details)
+
         if not is_valid:
             details[symbol] = {
-                "rows": len(df), 
-                "stored": False, 
+                "rows": len(df),
+                "stored": False,
                 "validation_passed": False,
                 "validation_issues": issues,
                 "quality_score": quality_score
             }
             validation_errors.append(f"{symbol}: {', '.join(issues)}")
-            cumulative_quality_scores.append(quality_score)  # Add to cumulative scores
-            # Add to weighted calculation
-            total_weighted_score += quality_score * len(df)
-            # Collect timestamp details
-            if timestamp_details:
-                timestamp_details['symbol'] = symbol
-                all_timestamp_details.append(timestamp_details)
-            continue
-            
-        # Check if this is validation-only mode
-        if payload.validate_only:
-            # VALIDATION-ONLY MODE: NO STORAGE AT ALL
-            print(f"🔍 VALIDATION-ONLY MODE: Skipping storage for {symbol}")
-            details[symbol] = {
-                "rows": len(df), 
-                "stored": False,  # NEVER stored in validation-only mode
-                "validation_passed": True,
-                "quality_score": quality_score,
-                "validation_only": True
-            }
-            
-            # Add validation warnings even if validation passed (quality score >= threshold)
-            if issues:
-                details[symbol]["validation_warnings"] = issues
-                validation_warnings.append(f"{symbol}: {', '.join(issues)}")
-            
-            # Add to cumulative quality scores
-            cumulative_quality_scores.append(quality_score)
-            # Add to weighted calculation
-            total_weighted_score += quality_score * len(df)
-            
-            print(f"🔍 DEBUG VALIDATION-ONLY: {symbol} - quality_score={quality_score}, rows={len(df)}, weighted_contribution={quality_score * len(df)}")
-            
-            # Update total rows for weighted calculation
-            total_rows += len(df)
-            
-            # Collect timestamp details
-            if timestamp_details:
-                timestamp_details['symbol'] = symbol
-                all_timestamp_details.append(timestamp_details)
-            
-            # Skip storage completely - just continue to next symbol
             continue
-        else:
-            # Normal mode - store the data
-            ok = dm.store_ohlcv_data(df, symbol, data_source='zerodha_kite', skip_validation=True)
-            details[symbol] = {
-                "rows": len(df), 
-                "stored": bool(ok), 
-                "validation_passed": True,
-                "quality_score": quality_score
-            }
-            
-            # Add validation warnings even if validation passed (quality score >= threshold)
-            if issues:
-                details[symbol]["validation_warnings"] = issues
-                validation_warnings.append(f"{symbol}: {', '.join(issues)}")
-            
-            # Add to cumulative quality scores
-            cumulative_quality_scores.append(quality_score)
-            # Add to weighted calculation
-            total_weighted_score += quality_score * len(df)
-            # Collect timestamp details
-            if timestamp_details:
-                timestamp_details['symbol'] = symbol
-                all_timestamp_details.append(timestamp_details)
-        
+
+        # Single code path for both modes: decide once whether this run stores
+        store = not payload.validate_only
+        stored = dm.store_ohlcv_data(df, symbol, data_source='zerodha_kite', skip_validation=True) if store else False
+        details[symbol] = {
+            "rows": len(df),
+            "stored": bool(stored),
+            "validation_passed": True,
+            "quality_score": quality_score
+        }
+        if not store:
+            details[symbol]["validation_only"] = True
+        # Surface warnings even when validation passed (score >= threshold)
+        if issues:
+            details[symbol]["validation_warnings"] = issues
+            validation_warnings.append(f"{symbol}: {', '.join(issues)}")
         total_rows += len(df)
-    
-    # Calculate both simple average and weighted average quality scores
+
+    # Both averages in one vectorized pass over the collected records
     simple_average_score = 0.0
     weighted_average_score = 0.0
-    
-    print(f"🔍 DEBUG: cumulative_quality_scores = {cumulative_quality_scores}")
-    print(f"🔍 DEBUG: total_weighted_score = {total_weighted_score}")
-    print(f"🔍 DEBUG: total_rows = {total_rows}")
-    
-    if cumulative_quality_scores:
-        # Simple average (equal weight for each symbol)
-        simple_average_score = sum(cumulative_quality_scores) / len(cumulative_quality_scores)
-        
-        # Weighted average (weighted by data volume)
-        weighted_average_score = total_weighted_score / total_rows if total_rows > 0 else 0.0
-        
-        print(f"🔍 DEBUG: simple_average_score = {simple_average_score}")
-        print(f"🔍 DEBUG: weighted_average_score = {weighted_average_score}")
-    
+    if score_records:
+        scores = np.array([r[0] for r in score_records], dtype=np.float64)
+        weights = np.array([r[1] for r in score_records], dtype=np.float64)
+        simple_average_score = float(scores.mean())
+        weighted_average_score = float((scores * weights).sum() / weights.sum())
+        logger.debug("simple_average=%s weighted_average=%s", simple_average_score, weighted_average_score)
+
     response = {
         "symbols": len(payload.symbols), 
         "total_rows": total_rows, 
@@ -227,7 +320,7 @@ def ingest_historical(payload: HistoricalIngestBody, dm: DataManager = Depends(g
     # Export timestamp details to Excel if there are any issues
     excel_file_path = None
     if all_timestamp_details:
-        excel_file_path = dm.export_timestamp_details_to_excel(all_timestamp_details, payload.start, payload.end)
+        excel_file_path = dm.export_timestamp_details_to_excel(all_timestamp_details, payload.start.isoformat(), payload.end.isoformat())
         response["timestamp_details_excel"] = excel_file_path
         
     return response
@@ -7,6 +7,16 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Prefer mysqlclient (C extension over libmysqlclient) when installed: row
+# decoding happens in C instead of pure Python, which roughly halves the cost
+# of row-fetch heavy reads. Fall back to mysql-connector-python otherwise.
+try:
+    import MySQLdb  # noqa: F401 - availability probe for the mysqlclient driver
+    _DB_DRIVER = 'mysqldb'
+except Exception:
+    _DB_DRIVER = 'mysqlconnector'
+
+
 def _resolve_mysql_url() -> str:
     user = os.getenv('DB_USER')
     password = os.getenv('DB_PASSWORD')
@@ -31,29 +41,36 @@ def _resolve_mysql_url() -> str:
     safe_password = quote_plus(password)
 
     host_part = f"{host}:{port}" if port else host
-    return f"mysql+mysqlconnector://{safe_user}:{safe_password}@{host_part}/{database}"
+    return f"mysql+{_DB_DRIVER}://{safe_user}:{safe_password}@{host_part}/{database}"
+
+
+def _driver_connect_args() -> dict:
+    connect_args = {
+        "charset": "utf8mb4",
+        "sql_mode": "TRADITIONAL",
+        "connect_timeout": 60,  # Connection timeout
+        "read_timeout": 60,     # Read timeout
+        "write_timeout": 60,    # Write timeout
+        "use_unicode": True,
+    }
+    if _DB_DRIVER == 'mysqlconnector':
+        # mysql-connector-python specific options (mysqlclient rejects these)
+        connect_args["autocommit"] = False
+        connect_args["get_warnings"] = True
+    return connect_args
 
 
 db_url = _resolve_mysql_url()
 
 engine = create_engine(
-    db_url, 
+    db_url,
     pool_pre_ping=True,
     pool_size=5,  # Reduced pool size to avoid overwhelming MySQL
     max_overflow=10,  # Reduced overflow
     pool_timeout=60,  # Increased timeout
     pool_recycle=1800,  # Recycle connections every 30 minutes
     pool_reset_on_return='commit',  # Reset connections on return
-    connect_args={
-        "charset": "utf8mb4",
-        "autocommit": False,
-        "sql_mode": "TRADITIONAL",
-        "connect_timeout": 60,  # Connection timeout
-        "read_timeout": 60,     # Read timeout
-        "write_timeout": 60,    # Write timeout
-        "use_unicode": True,
-        "get_warnings": True
-    }
+    connect_args=_driver_connect_args()
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
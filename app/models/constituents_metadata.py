@@ -5,7 +5,7 @@ from sqlalchemy.sql import func
 class ConstituentsMetadata(Base):
     __tablename__ = 'constituents_metadata'
     
-    symbol = Column(String(20), primary_key=True)
+    symbol = Column(String(10, collation='ascii_bin'), primary_key=True)
     company_name = Column(String(200), nullable=False)
     sector = Column(String(100), nullable=False)
     market_cap_category = Column(String(20), default='Large')
@@ -5,7 +5,7 @@ class DataQualityLog(Base):
     __tablename__ = 'data_quality_log'
     
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
-    symbol = Column(String(20))
+    symbol = Column(String(10, collation='ascii_bin'))
     timestamp = Column(DateTime, default=None)
     quality_score = Column(Float)
     issues_found = Column(Text)
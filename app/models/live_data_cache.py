@@ -5,7 +5,7 @@ from sqlalchemy.sql import func
 class LiveDataCache(Base):
     __tablename__ = 'live_data_cache'
     
-    symbol = Column(String(20), primary_key=True)
+    symbol = Column(String(10, collation='ascii_bin'), primary_key=True)
     timestamp = Column(DateTime, nullable=False)
     open = Column(Float, nullable=False)
     high = Column(Float, nullable=False)
@@ -1,21 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime
 from app.database import Base
 from sqlalchemy.sql import func
 
 class OHLCV(Base):
     __tablename__ = 'ohlcv_data'
-    
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, nullable=False)
-    symbol = Column(String(20), nullable=False)
+
+    # Composite clustered primary key: InnoDB stores rows in PK order, so all
+    # bars for a symbol sit contiguously and latest-N reads stay sequential.
+    # It also enforces one bar per symbol per timestamp, replacing the old
+    # surrogate id + uix_timestamp_symbol pair (see revision 4218bfb197f8).
+    # 10 ASCII chars covers every NSE ticker; ascii_bin keeps index keys
+    # compact and symbol comparisons a plain memcmp.
+    symbol = Column(String(10, collation='ascii_bin'), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
     open = Column(Float, nullable=False)
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
     close = Column(Float, nullable=False)
     volume = Column(Integer, nullable=False)
+    # Nullable metadata trails the hot fixed-width columns; declared order
+    # matches the create-table migration's packing (see 4218bfb197f8).
+    sector = Column(String(50))
     data_source = Column(String(50), default='zerodha_kite')
     quality_score = Column(Float, default=1.0)
-    sector = Column(String(50))
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    __table_args__ = (UniqueConstraint('timestamp', 'symbol', name='uix_timestamp_symbol'),)
\ No newline at end of file
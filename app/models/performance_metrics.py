@@ -8,7 +8,7 @@ class PerformanceMetrics(Base):
     id = Column(Integer, primary_key=True, autoincrement=True,nullable=False)
     timestamp = Column(DateTime)
     operation = Column(String(100))
-    symbol = Column(String(20))
+    symbol = Column(String(10, collation='ascii_bin'))
     duration_ms = Column(Float)
     records_affected = Column(Integer)
     success = Column(Boolean)
@@ -1,15 +1,29 @@
+import heapq
 import logging
+import os
+import queue
+import sys
 import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+import orjson
 import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import bindparam, select, func, text
 from sqlalchemy.dialects.mysql import insert as mysql_insert
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
 from app.database import SessionLocal, engine
 from app.models.ohlcv_data import OHLCV
 from app.models.constituents_metadata import ConstituentsMetadata
@@ -22,6 +36,44 @@ from app.validation import DataValidator
 from app.services.zerodha_service import ZerodhaService
 
 
+# Compiled once; pd.read_sql_query fetches straight into columns without
+# hydrating one ORM instance per bar.
+_LATEST_BARS_SQL = text(
+    "SELECT timestamp, open, high, low, close, volume, quality_score, sector "
+    "FROM ohlcv_data "
+    "WHERE symbol = :symbol "
+    "ORDER BY timestamp DESC LIMIT :count"
+)
+
+# Latest N bars for many symbols in one round trip via a window function
+_LATEST_BARS_MULTI_SQL = text(
+    "SELECT timestamp, symbol, open, high, low, close, volume, quality_score, sector FROM ("
+    "SELECT timestamp, symbol, open, high, low, close, volume, quality_score, sector, "
+    "ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY timestamp DESC) AS rn "
+    "FROM ohlcv_data WHERE symbol IN :symbols"
+    ") ranked WHERE rn <= :count"
+).bindparams(bindparam('symbols', expanding=True))
+
+# Compact dtypes for cached frames: sector repeats across rows and
+# quality_score never feeds arithmetic, so both compress safely. Price
+# columns stay float64 — a float32 round-trip through to_dict('records')
+# boxes back to a Python double and turns 100.05 into 100.05000305...,
+# so API responses would differ between cache hits and misses (and near
+# the 200000 price-range cap the float32 step exceeds half a tick).
+_CACHE_DTYPES = {
+    'quality_score': 'float32',
+    'volume': 'int64',
+    'sector': 'category',
+}
+
+_HISTORICAL_BARS_SQL = text(
+    "SELECT timestamp, open, high, low, close, volume, quality_score, sector "
+    "FROM ohlcv_data "
+    "WHERE symbol = :symbol AND timestamp BETWEEN :start AND :end "
+    "ORDER BY timestamp"
+)
+
+
 class DataManager:
     """MySQL-backed Data Manager using SQLAlchemy models."""
 
@@ -38,6 +90,11 @@ class DataManager:
         self.constituents = NiftyConstituentsManager.get_constituents()
         self.symbols_list = NiftyConstituentsManager.get_symbols_list()
         self.sectors = NiftyConstituentsManager.get_sectors()
+        # The symbol universe is fixed for the process lifetime; serialize it
+        # once so /symbols can return the bytes as-is.
+        self.symbols_json = orjson.dumps(self.symbols_list)
+        # Flat symbol -> sector map so hot paths skip the nested dict lookup
+        self._symbol_sector = {s: info['sector'] for s, info in self.constituents.items()}
 
         self._validation_rules = {
             'price_range': {'min': 0.1, 'max': 200000},
@@ -55,29 +112,64 @@ class DataManager:
 
         self._initialize_database_metadata()
 
+        # Adaptive batch sizing: config['batch_size'] is only the starting
+        # point. Batches that execute fast are doubled, slow or failing ones
+        # halved, within [min, max] bounds.
+        self._min_batch_size = 500
+        self._max_batch_size = 20000
+        self._current_batch_size = int(self.config.get('batch_size', 5000))
+        self._batch_target_ms = 2000.0
+
+        # Upsert template built once; executed with parameter lists below so
+        # the driver batches via executemany without per-batch recompilation.
+        stmt = mysql_insert(OHLCV.__table__)
+        update_cols = {col: stmt.inserted[col] for col in ('open', 'high', 'low', 'close', 'volume', 'data_source', 'quality_score', 'sector')}
+        # The model's client-side onupdate does not fire through this raw
+        # upsert, so bump updated_at explicitly.
+        update_cols['updated_at'] = func.now()
+        self._ohlcv_upsert = stmt.on_duplicate_key_update(**update_cols)
+
         self.validator = DataValidator(self.config, self._validation_rules, self.logger)
 
-        # caching
-        self._cache: Dict[str, Tuple[datetime, pd.DataFrame]] = {}
-        self._cache_timestamps: Dict[str, datetime] = {}
+        # caching: OrderedDict in LRU order (oldest first)
+        self._cache: 'OrderedDict[str, Tuple[datetime, pd.DataFrame]]' = OrderedDict()
         self._cache_stats = {'hits': 0, 'misses': 0}
         self._cache_lock = threading.Lock()
         self._max_cache_age = timedelta(minutes=5)
+        # Min-heap of (monotonic deadline, key); the cleanup thread sleeps
+        # until the earliest deadline instead of sweeping the whole cache.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Secondary index symbol -> cache keys so invalidation touches only
+        # that symbol's entries (the old substring scan also matched prefixes,
+        # e.g. 'INF' invalidating 'INFY' keys).
+        self._symbol_keys: Dict[str, set] = {}
+        self._key_symbol: Dict[str, str] = {}
         self._start_cache_cleanup()
 
+        # Metric/quality rows queue here; a daemon thread flushes them in
+        # multi-row inserts so ingest never waits on a logging commit.
+        self._log_queue: queue.Queue = queue.Queue()
+        self._start_log_flusher()
+
     def _initialize_database_metadata(self):
         session: Session = SessionLocal()
         try:
-            for symbol, info in self.constituents.items():
-                existing = session.get(ConstituentsMetadata, symbol)
-                if not existing:
-                    session.add(ConstituentsMetadata(
-                        symbol=symbol,
-                        company_name=info['name'],
-                        sector=info['sector'],
-                        is_active=True
-                    ))
-            session.commit()
+            # One SELECT for the existing symbols instead of a session.get
+            # round trip per constituent; then a single bulk insert.
+            existing = {row[0] for row in session.execute(select(ConstituentsMetadata.symbol))}
+            missing = [
+                ConstituentsMetadata(
+                    symbol=symbol,
+                    company_name=info['name'],
+                    sector=info['sector'],
+                    is_active=True
+                )
+                for symbol, info in self.constituents.items()
+                if symbol not in existing
+            ]
+            if missing:
+                session.add_all(missing)
+                session.commit()
         except Exception as exc:
             session.rollback()
             self.logger.error(f"Failed to initialize metadata: {exc}")
@@ -86,27 +178,27 @@ class DataManager:
             session.close()
 
     def validate_data_quality(self, data: pd.DataFrame, symbol: Optional[str] = None, skip_logging: bool = False) -> Tuple[bool, List[str], float, dict]:
-        print(f"🔍 DataManager.validate_data_quality called for {symbol}, skip_logging={skip_logging}")
+        self.logger.debug("validate_data_quality called for %s, skip_logging=%s", symbol, skip_logging)
         is_valid, issues, score, timestamp_details = self.validator.validate_data_quality(data, symbol, skip_logging)
         if issues and symbol and not skip_logging:
-            print(f"🔍 About to call _log_quality for {symbol}")
+            self.logger.debug("logging quality issues for %s", symbol)
             self._log_quality(symbol, issues, score)
         elif issues and symbol and skip_logging:
-            print(f"🔍 Skipping _log_quality for {symbol} (validation-only mode)")
+            self.logger.debug("skipping quality log for %s (validation-only mode)", symbol)
         return is_valid, issues, score, timestamp_details
 
     def store_ohlcv_data(self, data: pd.DataFrame, symbol: str, data_source: str = 'zerodha_kite', skip_validation: bool = False) -> bool:
-        print(f"🚨 STORAGE METHOD CALLED for {symbol} with {len(data)} rows")
+        self.logger.debug("store_ohlcv_data called for %s with %d rows", symbol, len(data))
         if data.empty:
             return True
 
         data_copy = data.copy()
-        data_copy['symbol'] = symbol
-        data_copy['data_source'] = data_source
+        # Interned strings: every row in the insert batch shares one object
+        # for symbol/data_source instead of allocating per-row copies.
+        data_copy['symbol'] = sys.intern(symbol)
+        data_copy['data_source'] = sys.intern(data_source)
         data_copy['timestamp'] = pd.to_datetime(data_copy['timestamp'])
-
-        if symbol in self.constituents:
-            data_copy['sector'] = self.constituents[symbol]['sector']
+        data_copy['sector'] = self._symbol_sector.get(symbol)
 
         # Only validate if not explicitly skipped (for cases where validation was already done)
         if not skip_validation:
@@ -120,63 +212,82 @@ class DataManager:
             
         data_copy['quality_score'] = quality_score
 
+        # Coerce dtypes column-wise up front so the per-batch conversion below
+        # is a single Cython to_dict pass with no per-cell float()/int() calls.
+        for col in ('open', 'high', 'low', 'close', 'quality_score'):
+            data_copy[col] = data_copy[col].astype('float64')
+        data_copy['volume'] = data_copy['volume'].astype('int64')
+        # Refetches commonly repeat (symbol, timestamp) pairs; the upsert would
+        # write each occurrence, so drop them here (keep=last matches ON
+        # DUPLICATE KEY semantics). Sorting by timestamp keeps the batch
+        # append-ordered for the clustered index.
+        data_copy = (
+            data_copy.drop_duplicates(subset=['symbol', 'timestamp'], keep='last')
+            .sort_values('timestamp')
+            .reset_index(drop=True)
+        )
+        data_copy['timestamp'] = np.array(pd.DatetimeIndex(data_copy['timestamp']).to_pydatetime(), dtype=object)
+        data_copy = data_copy[['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'data_source', 'quality_score', 'sector']]
+
         # Process data in batches to avoid memory and database limits
-        batch_size = self.config.get('batch_size', 10000)
         total_rows = len(data_copy)
         successful_batches = 0
         failed_batches = 0
-        
-        self.logger.info(f"Storing {total_rows} rows for {symbol} in batches of {batch_size}")
-        
-        for start_idx in range(0, total_rows, batch_size):
-            end_idx = min(start_idx + batch_size, total_rows)
-            batch_data = data_copy.iloc[start_idx:end_idx]
-            
-            # Convert batch to rows
-            rows: List[Dict[str, Any]] = []
-            for _, r in batch_data.iterrows():
-                rows.append({
-                    'timestamp': r['timestamp'].to_pydatetime() if isinstance(r['timestamp'], pd.Timestamp) else r['timestamp'],
-                    'symbol': r['symbol'],
-                    'open': float(r['open']),
-                    'high': float(r['high']),
-                    'low': float(r['low']),
-                    'close': float(r['close']),
-                    'volume': int(r['volume']),
-                    'data_source': r.get('data_source', data_source),
-                    'quality_score': float(r.get('quality_score', 1.0)),
-                    'sector': r.get('sector')
-                })
-
-            # Retry logic for database operations
-            max_retries = 3
-            batch_success = False
-            
-            for retry_attempt in range(max_retries):
-                session: Session = SessionLocal()
-                try:
-                    stmt = mysql_insert(OHLCV.__table__).values(rows)
-                    update_cols = {col: stmt.inserted[col] for col in ['open', 'high', 'low', 'close', 'volume', 'data_source', 'quality_score', 'sector']}
-                    ondup = stmt.on_duplicate_key_update(**update_cols)
-                    session.execute(ondup)
-                    session.commit()
-                    successful_batches += 1
-                    batch_success = True
-                    self.logger.debug(f"Successfully stored batch {start_idx}-{end_idx-1} for {symbol}")
-                    break
-                except Exception as exc:
-                    session.rollback()
-                    if retry_attempt < max_retries - 1:
-                        self.logger.warning(f"Batch {start_idx}-{end_idx-1} for {symbol} failed (attempt {retry_attempt + 1}/{max_retries}): {exc}. Retrying...")
-                        # Wait before retry (exponential backoff)
-                        import time
-                        time.sleep(2 ** retry_attempt)
-                    else:
-                        failed_batches += 1
-                        self.logger.error(f"Failed to store batch {start_idx}-{end_idx-1} for {symbol} after {max_retries} attempts: {exc}")
-                finally:
-                    session.close()
-        
+
+        self.logger.info(f"Storing {total_rows} rows for {symbol} starting at batches of {self._current_batch_size}")
+
+        # One pooled connection for the whole store call; each batch commits
+        # its own transaction so partial success is still possible, without
+        # paying a pool checkout per batch (and per retry).
+        conn = engine.connect()
+        try:
+            start_idx = 0
+            while start_idx < total_rows:
+                end_idx = min(start_idx + self._current_batch_size, total_rows)
+                batch_data = data_copy.iloc[start_idx:end_idx]
+
+                # Convert batch to rows; to_dict boxes numerics to native Python
+                # scalars and timestamps were converted to datetime above.
+                rows: List[Dict[str, Any]] = batch_data.to_dict(orient='records')
+
+                # Retry logic for database operations
+                max_retries = 3
+
+                for retry_attempt in range(max_retries):
+                    try:
+                        # executemany form on a Core connection: the driver sends
+                        # the batch through its bulk protocol with no ORM session
+                        # setup and no per-batch statement compilation.
+                        batch_started = time.perf_counter()
+                        with conn.begin():
+                            conn.execute(self._ohlcv_upsert, rows)
+                        elapsed_ms = (time.perf_counter() - batch_started) * 1000.0
+                        self._tune_batch_size(elapsed_ms)
+                        successful_batches += 1
+                        self.logger.debug(f"Successfully stored batch {start_idx}-{end_idx-1} for {symbol}")
+                        break
+                    except Exception as exc:
+                        # Failures (packet size, timeouts) shrink subsequent batches
+                        self._current_batch_size = max(self._min_batch_size, self._current_batch_size // 2)
+                        # The connection may be poisoned (dropped socket, server
+                        # timeout); discard it and draw a fresh one before retrying.
+                        try:
+                            conn.close()
+                        except Exception:
+                            pass
+                        conn = engine.connect()
+                        if retry_attempt < max_retries - 1:
+                            self.logger.warning(f"Batch {start_idx}-{end_idx-1} for {symbol} failed (attempt {retry_attempt + 1}/{max_retries}): {exc}. Retrying...")
+                            # Wait before retry (exponential backoff)
+                            time.sleep(2 ** retry_attempt)
+                        else:
+                            failed_batches += 1
+                            self.logger.error(f"Failed to store batch {start_idx}-{end_idx-1} for {symbol} after {max_retries} attempts: {exc}")
+
+                start_idx = end_idx
+        finally:
+            conn.close()
+
         # Invalidate caches for symbol after all batches are processed
         if successful_batches > 0:
             self._invalidate_cache(symbol)
@@ -190,102 +301,106 @@ class DataManager:
             self.logger.error(f"All batches failed for {symbol}")
             return False
 
+    def _tune_batch_size(self, elapsed_ms: float):
+        """Grow fast batches, shrink slow ones; the optimum is workload-
+        dependent with a broad plateau, so coarse doubling/halving is enough."""
+        if elapsed_ms > self._batch_target_ms:
+            self._current_batch_size = max(self._min_batch_size, self._current_batch_size // 2)
+        elif elapsed_ms < self._batch_target_ms / 4:
+            self._current_batch_size = min(self._max_batch_size, self._current_batch_size * 2)
+
     def get_latest_bars(self, symbol: str, count: int = 100) -> pd.DataFrame:
         cache_key = f"latest_{symbol}_{count}"
         cached = self._get_from_cache(cache_key)
         if cached is not None:
             return cached
 
-        session: Session = SessionLocal()
-        try:
-            q = (
-                session.query(OHLCV)
-                .filter(OHLCV.symbol == symbol)
-                .order_by(OHLCV.timestamp.desc())
-                .limit(count)
-            )
-            rows = list(q)
-            if not rows:
-                return pd.DataFrame()
-            df = pd.DataFrame([
-                {
-                    'timestamp': r.timestamp,
-                    'open': r.open,
-                    'high': r.high,
-                    'low': r.low,
-                    'close': r.close,
-                    'volume': r.volume,
-                    'quality_score': r.quality_score,
-                    'sector': r.sector,
-                }
-                for r in rows
-            ]).sort_values('timestamp')
-            df = df.reset_index(drop=True)
-            self._store_in_cache(cache_key, df)
-            return df
-        finally:
-            session.close()
+        df = pd.read_sql_query(
+            _LATEST_BARS_SQL,
+            engine,
+            params={'symbol': symbol, 'count': count},
+        )
+        if df.empty:
+            return pd.DataFrame()
+        df = df.sort_values('timestamp').reset_index(drop=True)
+        self._store_in_cache(cache_key, symbol, df)
+        return df
 
     def get_historical_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
-        session: Session = SessionLocal()
-        try:
-            rows = (
-                session.query(OHLCV)
-                .filter(OHLCV.symbol == symbol)
-                .filter(OHLCV.timestamp >= start_date)
-                .filter(OHLCV.timestamp <= end_date)
-                .order_by(OHLCV.timestamp.asc())
-                .all()
-            )
-            if not rows:
-                return pd.DataFrame()
-            df = pd.DataFrame([
-                {
-                    'timestamp': r.timestamp,
-                    'open': r.open,
-                    'high': r.high,
-                    'low': r.low,
-                    'close': r.close,
-                    'volume': r.volume,
-                    'quality_score': r.quality_score,
-                    'sector': r.sector,
-                }
-                for r in rows
-            ])
-            return df
-        finally:
-            session.close()
+        df = pd.read_sql_query(
+            _HISTORICAL_BARS_SQL,
+            engine,
+            params={'symbol': symbol, 'start': start_date, 'end': end_date},
+        )
+        if df.empty:
+            return pd.DataFrame()
+        return df
 
     def export_data(self, symbols: List[str], start_date: datetime, end_date: datetime, fmt: str = 'csv', file_path: Optional[str] = None) -> str:
         if fmt not in self.config['export_formats']:
             raise ValueError(f"Unsupported format: {fmt}")
 
-        all_data: List[pd.DataFrame] = []
-        for s in symbols:
-            df = self.get_historical_data(s, start_date, end_date)
-            if not df.empty:
-                df['symbol'] = s
-                all_data.append(df)
-        if not all_data:
-            raise ValueError("No data to export")
-
-        combined = pd.concat(all_data, ignore_index=True).sort_values(['symbol', 'timestamp'])
-
         if not file_path:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             symbols_str = '_'.join(symbols[:3]) + ('_etc' if len(symbols) > 3 else '')
             file_path = f"exports/nifty50_data_{symbols_str}_{timestamp}.{fmt}"
 
+        def _chunks():
+            # Chunked SQL reads keep peak memory at one chunk instead of the
+            # full symbol x date-range result set. Symbols are emitted in
+            # sorted order and the SQL orders by timestamp, so the output
+            # matches the old sort_values(['symbol', 'timestamp']).
+            for s in sorted(set(symbols)):
+                for chunk in pd.read_sql_query(
+                    _HISTORICAL_BARS_SQL,
+                    engine,
+                    params={'symbol': s, 'start': start_date, 'end': end_date},
+                    chunksize=50000,
+                ):
+                    if not chunk.empty:
+                        chunk['symbol'] = s
+                        yield chunk
+
+        wrote_any = False
         if fmt == 'csv':
-            combined.to_csv(file_path, index=False)
-        elif fmt == 'json':
-            combined.to_json(file_path, orient='records', date_format='iso')
-        elif fmt == 'parquet':
-            combined.to_parquet(file_path, index=False)
+            with open(file_path, 'w', newline='') as fh:
+                for chunk in _chunks():
+                    chunk.to_csv(fh, index=False, header=not wrote_any)
+                    wrote_any = True
+        elif fmt == 'parquet' and PYARROW_AVAILABLE:
+            # One row group per chunk via ParquetWriter; never holds the
+            # combined frame in memory.
+            writer = None
+            try:
+                for chunk in _chunks():
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(file_path, table.schema)
+                    writer.write_table(table)
+                    wrote_any = True
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            # json (and parquet without pyarrow) still needs the full frame
+            all_data = list(_chunks())
+            if all_data:
+                combined = pd.concat(all_data, ignore_index=True)
+                if fmt == 'json':
+                    combined.to_json(file_path, orient='records', date_format='iso')
+                else:
+                    combined.to_parquet(file_path, index=False)
+                wrote_any = True
+
+        if not wrote_any:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            raise ValueError("No data to export")
 
         size_bytes = 0
         try:
-            import os
             size_bytes = os.path.getsize(file_path)
         except Exception:
             pass
@@ -307,6 +422,27 @@ class DataManager:
 
         return file_path
 
+    def iter_export_csv(self, symbols: List[str], start_date: datetime, end_date: datetime, chunk_size: int = 50000):
+        """Yield CSV-encoded chunks for a multi-symbol export.
+
+        Streams straight from chunked SQL reads so peak memory stays at one
+        chunk regardless of the requested date range.
+        """
+        wrote_header = False
+        for symbol in symbols:
+            chunks = pd.read_sql_query(
+                _HISTORICAL_BARS_SQL,
+                engine,
+                params={'symbol': symbol, 'start': start_date, 'end': end_date},
+                chunksize=chunk_size,
+            )
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                chunk['symbol'] = symbol
+                yield chunk.to_csv(index=False, header=not wrote_header).encode()
+                wrote_header = True
+
     def export_timestamp_details_to_excel(self, timestamp_details: List[dict], start_date: str, end_date: str) -> str:
         """Export timestamp details (non-trading days and missing intervals) to Excel file."""
         import pandas as pd
@@ -322,114 +458,114 @@ class DataManager:
         filename = f"timestamp_details_{start_date}_to_{end_date}_{timestamp_str}.xlsx"
         file_path = os.path.join(exports_dir, filename)
         
-        # Prepare data for Excel export
-        non_trading_data = []
-        non_trading_ohlcv_data = []
-        gap_data = []
-        missing_consecutive_data = []
-        
+        def _naive(series: pd.Series) -> pd.Series:
+            # Vectorized replace(tzinfo=None): tz_localize(None) drops the zone
+            # while preserving the wall-clock time.
+            ts = pd.to_datetime(series)
+            if ts.dt.tz is not None:
+                ts = ts.dt.tz_localize(None)
+            return ts
+
+        def _text_col(df: pd.DataFrame, name: str):
+            return df[name].fillna('') if name in df.columns else ''
+
+        # Build each sheet from per-symbol DataFrames instead of per-item
+        # dicts; the tz-strip and date/time splits run as column operations.
+        non_trading_frames = []
+        non_trading_ohlcv_frames = []
+        gap_frames = []
+        missing_consecutive_frames = []
+
         for symbol_data in timestamp_details:
             symbol = symbol_data.get('symbol', 'Unknown')
-            
-            # Process non-trading timestamps
-            for item in symbol_data.get('non_trading_timestamps', []):
-                timestamp = item['timestamp']
-                # Convert to timezone-naive if needed
-                if timestamp.tzinfo is not None:
-                    timestamp = timestamp.replace(tzinfo=None)
-                
-                non_trading_data.append({
+
+            items = symbol_data.get('non_trading_timestamps', [])
+            if len(items):
+                raw = items if isinstance(items, pd.DataFrame) else pd.DataFrame(items)
+                ts = _naive(raw['timestamp'])
+                non_trading_frames.append(pd.DataFrame({
                     'Symbol': symbol,
-                    'Timestamp': timestamp,
-                    'Date': timestamp.date(),
-                    'Time': timestamp.time(),
-                    'Reason': item['reason'],
-                    'Day': item.get('day', ''),
-                    'Holiday_Name': item.get('holiday_name', '')
-                })
-            
-            # Process non-trading OHLCV data
-            for item in symbol_data.get('non_trading_ohlcv_data', []):
-                timestamp = item['timestamp']
-                # Convert to timezone-naive if needed
-                if timestamp.tzinfo is not None:
-                    timestamp = timestamp.replace(tzinfo=None)
-                
-                non_trading_ohlcv_data.append({
+                    'Timestamp': ts,
+                    'Date': ts.dt.date,
+                    'Time': ts.dt.time,
+                    'Reason': raw['reason'],
+                    'Day': _text_col(raw, 'day'),
+                    'Holiday_Name': _text_col(raw, 'holiday_name')
+                }))
+
+            items = symbol_data.get('non_trading_ohlcv_data', [])
+            if len(items):
+                raw = items if isinstance(items, pd.DataFrame) else pd.DataFrame(items)
+                ts = _naive(raw['timestamp'])
+                non_trading_ohlcv_frames.append(pd.DataFrame({
                     'Symbol': symbol,
-                    'Timestamp': timestamp,
-                    'Date': timestamp.date(),
-                    'Time': timestamp.time(),
-                    'Reason': item['reason'],
-                    'Day': item.get('day', ''),
-                    'Holiday_Name': item.get('holiday_name', ''),
-                    'Open': item.get('open', None),
-                    'High': item.get('high', None),
-                    'Low': item.get('low', None),
-                    'Close': item.get('close', None),
-                    'Volume': item.get('volume', None)
-                })
-            
-            # Process gap details
-            for item in symbol_data.get('gap_details', []):
-                gap_start = item['gap_start']
-                gap_end = item['gap_end']
-                
-                # Convert to timezone-naive if needed
-                if gap_start.tzinfo is not None:
-                    gap_start = gap_start.replace(tzinfo=None)
-                if gap_end.tzinfo is not None:
-                    gap_end = gap_end.replace(tzinfo=None)
-                
-                gap_data.append({
+                    'Timestamp': ts,
+                    'Date': ts.dt.date,
+                    'Time': ts.dt.time,
+                    'Reason': raw['reason'],
+                    'Day': _text_col(raw, 'day'),
+                    'Holiday_Name': _text_col(raw, 'holiday_name'),
+                    'Open': raw.get('open'),
+                    'High': raw.get('high'),
+                    'Low': raw.get('low'),
+                    'Close': raw.get('close'),
+                    'Volume': raw.get('volume')
+                }))
+
+            items = symbol_data.get('gap_details', [])
+            if len(items):
+                raw = items if isinstance(items, pd.DataFrame) else pd.DataFrame(items)
+                gap_frames.append(pd.DataFrame({
                     'Symbol': symbol,
-                    'Gap_Start': gap_start,
-                    'Gap_End': gap_end,
-                    'Gap_Duration_Minutes': item['gap_duration_minutes'],
-                    'Missing_Intervals': item['missing_intervals'],
-                    'Expected_Interval_Minutes': item['expected_interval_minutes']
-                })
-            
-            # Process missing consecutive minutes
-            for item in symbol_data.get('missing_consecutive_minutes', []):
-                missing_timestamp = item['missing_timestamp']
-                prev_timestamp = item['prev_timestamp']
-                next_timestamp = item['next_timestamp']
-                
-                # Convert to timezone-naive if needed
-                if missing_timestamp.tzinfo is not None:
-                    missing_timestamp = missing_timestamp.replace(tzinfo=None)
-                if prev_timestamp.tzinfo is not None:
-                    prev_timestamp = prev_timestamp.replace(tzinfo=None)
-                if next_timestamp.tzinfo is not None:
-                    next_timestamp = next_timestamp.replace(tzinfo=None)
-                
-                missing_consecutive_data.append({
+                    'Gap_Start': _naive(raw['gap_start']),
+                    'Gap_End': _naive(raw['gap_end']),
+                    'Gap_Duration_Minutes': raw['gap_duration_minutes'],
+                    'Missing_Intervals': raw['missing_intervals'],
+                    'Expected_Interval_Minutes': raw['expected_interval_minutes']
+                }))
+
+            items = symbol_data.get('missing_consecutive_minutes', [])
+            if len(items):
+                raw = items if isinstance(items, pd.DataFrame) else pd.DataFrame(items)
+                missing_consecutive_frames.append(pd.DataFrame({
                     'Symbol': symbol,
-                    'Missing_Timestamp': missing_timestamp,
-                    'Previous_Timestamp': prev_timestamp,
-                    'Next_Timestamp': next_timestamp,
-                    'Gap_Duration_Minutes': item['gap_duration_minutes']
-                })
-        
-        # Create Excel file with multiple sheets
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            if non_trading_data:
-                non_trading_df = pd.DataFrame(non_trading_data)
+                    'Missing_Timestamp': _naive(raw['missing_timestamp']),
+                    'Previous_Timestamp': _naive(raw['prev_timestamp']),
+                    'Next_Timestamp': _naive(raw['next_timestamp']),
+                    'Gap_Duration_Minutes': raw['gap_duration_minutes']
+                }))
+
+        # Create Excel file with multiple sheets. xlsxwriter keeps rows as
+        # plain tuples instead of openpyxl's per-cell objects. Note: no
+        # constant_memory here — to_excel writes body cells column-major,
+        # and constant_memory discards writes to rows it has already
+        # flushed, which would blank every column after the first.
+        with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
+            total_non_trading = 0
+            total_non_trading_ohlcv = 0
+            total_gaps = 0
+            total_missing_consecutive = 0
+
+            if non_trading_frames:
+                non_trading_df = pd.concat(non_trading_frames, ignore_index=True)
+                total_non_trading = len(non_trading_df)
                 non_trading_df.to_excel(writer, sheet_name='Non_Trading_Days', index=False)
-            
-            if non_trading_ohlcv_data:
-                non_trading_ohlcv_df = pd.DataFrame(non_trading_ohlcv_data)
+
+            if non_trading_ohlcv_frames:
+                non_trading_ohlcv_df = pd.concat(non_trading_ohlcv_frames, ignore_index=True)
+                total_non_trading_ohlcv = len(non_trading_ohlcv_df)
                 non_trading_ohlcv_df.to_excel(writer, sheet_name='Non_Trading_OHLCV', index=False)
-            
-            if gap_data:
-                gap_df = pd.DataFrame(gap_data)
+
+            if gap_frames:
+                gap_df = pd.concat(gap_frames, ignore_index=True)
+                total_gaps = len(gap_df)
                 gap_df.to_excel(writer, sheet_name='Missing_Intervals', index=False)
-            
-            if missing_consecutive_data:
-                missing_consecutive_df = pd.DataFrame(missing_consecutive_data)
+
+            if missing_consecutive_frames:
+                missing_consecutive_df = pd.concat(missing_consecutive_frames, ignore_index=True)
+                total_missing_consecutive = len(missing_consecutive_df)
                 missing_consecutive_df.to_excel(writer, sheet_name='Missing_Consecutive_Minutes', index=False)
-            
+
             # Create summary sheet
             summary_data = {
                 'Metric': [
@@ -440,10 +576,10 @@ class DataManager:
                     'Date Range'
                 ],
                 'Value': [
-                    len(non_trading_data),
-                    len(non_trading_ohlcv_data),
-                    len(gap_data),
-                    len(missing_consecutive_data),
+                    total_non_trading,
+                    total_non_trading_ohlcv,
+                    total_gaps,
+                    total_missing_consecutive,
                     f"{start_date} to {end_date}"
                 ]
             }
@@ -454,98 +590,153 @@ class DataManager:
         return file_path
 
     def _log_performance(self, operation: str, symbol: Optional[str], duration_ms: float, success: bool, records: int = 0):
-        session: Session = SessionLocal()
-        try:
-            session.add(PerformanceMetrics(
-                operation=operation,
-                symbol=symbol,
-                duration_ms=duration_ms,
-                records_affected=records,
-                success=success
-            ))
-            session.commit()
-        except Exception:
-            session.rollback()
-        finally:
-            session.close()
+        self._log_queue.put((PerformanceMetrics.__table__, {
+            'operation': operation,
+            'symbol': symbol,
+            'duration_ms': duration_ms,
+            'records_affected': records,
+            'success': success
+        }))
 
     def _log_quality(self, symbol: str, issues: List[str], quality_score: float):
-        session: Session = SessionLocal()
-        try:
-            session.add(DataQualityLog(
-                symbol=symbol,
-                quality_score=quality_score,
-                issues_found='; '.join(issues),
-                severity=1 if quality_score > 0.8 else 2 if quality_score > 0.5 else 3
-            ))
-            session.commit()
-        except Exception:
-            session.rollback()
-        finally:
-            session.close()
+        self._log_queue.put((DataQualityLog.__table__, {
+            'symbol': symbol,
+            'quality_score': quality_score,
+            'issues_found': '; '.join(issues),
+            'severity': 1 if quality_score > 0.8 else 2 if quality_score > 0.5 else 3
+        }))
+
+    def _start_log_flusher(self):
+        def flush_logs():
+            while True:
+                try:
+                    # Block for the first row, then drain up to 500 more for
+                    # at most a second so bursts land as one insert per table.
+                    batch = [self._log_queue.get()]
+                    deadline = time.monotonic() + 1.0
+                    while len(batch) < 500:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            batch.append(self._log_queue.get(timeout=remaining))
+                        except queue.Empty:
+                            break
+                    rows_by_table: Dict[Any, List[Dict[str, Any]]] = {}
+                    for table, row in batch:
+                        rows_by_table.setdefault(table, []).append(row)
+                    with engine.begin() as conn:
+                        for table, rows in rows_by_table.items():
+                            conn.execute(table.insert(), rows)
+                except Exception as exc:
+                    self.logger.error(f"Log flush error: {exc}")
+        threading.Thread(target=flush_logs, daemon=True).start()
 
 
     # caching helpers
+    @staticmethod
+    def _freeze_frame(data: pd.DataFrame) -> pd.DataFrame:
+        # Mark the underlying arrays read-only so the frame can be shared
+        # between the cache and callers without the O(rows x cols) copy per
+        # hit; mutation attempts fail loudly instead of corrupting the cache.
+        for block in data._mgr.blocks:
+            try:
+                block.values.flags.writeable = False
+            except (AttributeError, ValueError):
+                pass
+        return data
+
+    def _remove_cache_key(self, key: str):
+        # Caller holds self._cache_lock. Drops the entry and its index rows.
+        self._cache.pop(key, None)
+        symbol = self._key_symbol.pop(key, None)
+        if symbol is not None:
+            keys = self._symbol_keys.get(symbol)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._symbol_keys[symbol]
+
     def _get_from_cache(self, key: str) -> Optional[pd.DataFrame]:
         with self._cache_lock:
             if key in self._cache:
                 cache_time, data = self._cache[key]
                 if datetime.now() - cache_time < self._max_cache_age:
                     self._cache_stats['hits'] += 1
-                    return data.copy()
+                    self._cache.move_to_end(key)
+                    return data
                 else:
-                    del self._cache[key]
-                    self._cache_timestamps.pop(key, None)
+                    self._remove_cache_key(key)
             self._cache_stats['misses'] += 1
             return None
 
-    def _store_in_cache(self, key: str, data: pd.DataFrame):
+    def _store_in_cache(self, key: str, symbol: str, data: pd.DataFrame):
+        data = data.astype({col: dtype for col, dtype in _CACHE_DTYPES.items() if col in data.columns})
         with self._cache_lock:
-            self._cache[key] = (datetime.now(), data.copy())
-            self._cache_timestamps[key] = datetime.now()
+            self._cache[key] = (datetime.now(), self._freeze_frame(data))
+            self._cache.move_to_end(key)
+            self._symbol_keys.setdefault(symbol, set()).add(key)
+            self._key_symbol[key] = symbol
+            heapq.heappush(self._expiry_heap, (time.monotonic() + self._max_cache_age.total_seconds(), key))
             if len(self._cache) > 500:
-                oldest_key = min(self._cache_timestamps.keys(), key=lambda k: self._cache_timestamps[k])
-                self._cache.pop(oldest_key, None)
-                self._cache_timestamps.pop(oldest_key, None)
+                evicted, _ = self._cache.popitem(last=False)
+                self._remove_cache_key(evicted)
 
     def _invalidate_cache(self, symbol: str):
         with self._cache_lock:
-            keys_to_remove = [k for k in list(self._cache.keys()) if symbol in k]
-            for k in keys_to_remove:
-                self._cache.pop(k, None)
-                self._cache_timestamps.pop(k, None)
+            for k in list(self._symbol_keys.get(symbol, ())):
+                self._remove_cache_key(k)
 
     def _start_cache_cleanup(self):
         def cleanup_cache():
             while True:
                 try:
-                    time.sleep(300)
-                    now = datetime.now()
+                    cleaned = 0
                     with self._cache_lock:
-                        expired = [k for k, (t, _) in self._cache.items() if now - t > self._max_cache_age]
-                        for k in expired:
-                            self._cache.pop(k, None)
-                            self._cache_timestamps.pop(k, None)
-                        if expired:
-                            self.logger.info(f"Cleaned {len(expired)} expired cache entries")
+                        now = time.monotonic()
+                        # Pop only the entries whose deadline has passed. A key
+                        # re-stored since its heap entry was pushed is still
+                        # fresh in the cache; skip it and let its newer heap
+                        # entry handle it.
+                        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                            _, key = heapq.heappop(self._expiry_heap)
+                            entry = self._cache.get(key)
+                            if entry and datetime.now() - entry[0] >= self._max_cache_age:
+                                self._remove_cache_key(key)
+                                cleaned += 1
+                        sleep_for = (self._expiry_heap[0][0] - now) if self._expiry_heap else 300.0
+                    if cleaned:
+                        self.logger.info(f"Cleaned {cleaned} expired cache entries")
+                    time.sleep(max(0.5, min(sleep_for, 300.0)))
                 except Exception as exc:
                     self.logger.error(f"Cache cleanup error: {exc}")
+                    time.sleep(300)
         threading.Thread(target=cleanup_cache, daemon=True).start()
 
     # additional features migrated from original module
-    def get_latest_bars_all_symbols(self, count: int = 100) -> Dict[str, pd.DataFrame]:
-        result: Dict[str, pd.DataFrame] = {}
-        for symbol in self.symbols_list:
-            result[symbol] = self.get_latest_bars(symbol, count)
+    def _latest_bars_for_symbols(self, symbols: List[str], count: int) -> Dict[str, pd.DataFrame]:
+        # One ROW_NUMBER() query replaces a DB round trip per symbol
+        df = pd.read_sql_query(
+            _LATEST_BARS_MULTI_SQL,
+            engine,
+            params={'symbols': list(symbols), 'count': count},
+        )
+        result: Dict[str, pd.DataFrame] = {symbol: pd.DataFrame() for symbol in symbols}
+        for symbol, group in df.groupby('symbol'):
+            result[symbol] = group.drop(columns='symbol').sort_values('timestamp').reset_index(drop=True)
         return result
 
+    def get_latest_bars_bulk(self, symbols: List[str], count: int = 100) -> Dict[str, pd.DataFrame]:
+        """Latest `count` bars for several symbols in one windowed query."""
+        return self._latest_bars_for_symbols(symbols, count)
+
+    def get_latest_bars_all_symbols(self, count: int = 100) -> Dict[str, pd.DataFrame]:
+        return self._latest_bars_for_symbols(self.symbols_list, count)
+
     def get_sector_data(self, sector: str, count: int = 100) -> Dict[str, pd.DataFrame]:
         if sector not in self.sectors:
             raise ValueError(f"Unknown sector: {sector}")
-        data: Dict[str, pd.DataFrame] = {}
-        for symbol in self.sectors[sector]:
-            data[symbol] = self.get_latest_bars(symbol, count)
-        return data
+        return self._latest_bars_for_symbols(self.sectors[sector], count)
 
     def fetch_and_store_live_data(self, zs: Optional[ZerodhaService], symbols: Optional[List[str]] = None) -> Dict[str, bool]:
         if not zs or not zs.credentials.access_token:
@@ -555,28 +746,38 @@ class DataManager:
         live = zs.fetch_live_quotes(symbols)
         if not live:
             return {}
-        session: Session = SessionLocal()
-        results: Dict[str, bool] = {}
+        # One multi-row upsert instead of a session.merge per symbol (merge
+        # issues a SELECT plus INSERT/UPDATE per row).
+        now = datetime.now()
+        rows = [
+            {
+                'symbol': symbol,
+                'timestamp': now,
+                'open': data.get('open', 0.0),
+                'high': data.get('high', 0.0),
+                'low': data.get('low', 0.0),
+                'close': data.get('close', 0.0),
+                'volume': data.get('volume', 0),
+            }
+            for symbol, data in live.items()
+        ]
+        stmt = mysql_insert(LiveDataCache.__table__)
+        stmt = stmt.on_duplicate_key_update(
+            timestamp=stmt.inserted.timestamp,
+            open=stmt.inserted.open,
+            high=stmt.inserted.high,
+            low=stmt.inserted.low,
+            close=stmt.inserted.close,
+            volume=stmt.inserted.volume,
+            last_updated=func.now(),
+        )
         try:
-            for symbol, data in live.items():
-                try:
-                    session.merge(LiveDataCache(
-                        symbol=symbol,
-                        timestamp=datetime.now(),
-                        open=data.get('open', 0.0),
-                        high=data.get('high', 0.0),
-                        low=data.get('low', 0.0),
-                        close=data.get('close', 0.0),
-                        volume=data.get('volume', 0)
-                    ))
-                    results[symbol] = True
-                except Exception as exc:
-                    self.logger.error(f"Error storing live data for {symbol}: {exc}")
-                    results[symbol] = False
-            session.commit()
-        finally:
-            session.close()
-        return results
+            with engine.begin() as conn:
+                conn.execute(stmt, rows)
+        except Exception as exc:
+            self.logger.error(f"Error storing live data batch: {exc}")
+            return {symbol: False for symbol in live}
+        return {symbol: True for symbol in live}
 
     def get_performance_stats(self) -> Dict[str, Any]:
         cache_hit_rate = 0.0
@@ -596,12 +797,11 @@ class DataManager:
             'issues': []
         }
         try:
-            session: Session = SessionLocal()
-            try:
-                session.query(func.count(OHLCV.id)).first()
-                health['database_connection'] = True
-            finally:
-                session.close()
+            # Liveness ping only: COUNT(*) on InnoDB is a full scan and made
+            # the health check cost grow with table size.
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            health['database_connection'] = True
 
             stats = self.get_performance_stats()
             if stats['cache_hit_rate_pct'] < 60:
@@ -617,6 +817,7 @@ class DataManager:
     def close(self):
         with self._cache_lock:
             self._cache.clear()
-            self._cache_timestamps.clear()
+            self._symbol_keys.clear()
+            self._key_symbol.clear()
 
 
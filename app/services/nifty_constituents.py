@@ -1,4 +1,12 @@
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+
+def _group_by_sector(constituents: Dict[str, Dict[str, str]]) -> Mapping[str, Tuple[str, ...]]:
+    sectors: Dict[str, List[str]] = {}
+    for symbol, info in constituents.items():
+        sectors.setdefault(info['sector'], []).append(symbol)
+    return MappingProxyType({sector: tuple(symbols) for sector, symbols in sectors.items()})
 
 
 class NiftyConstituentsManager:
@@ -55,20 +63,23 @@ class NiftyConstituentsManager:
         'WIPRO': {'name': 'Wipro Ltd.', 'sector': 'IT'}
     }
 
+    # The universe is static for the process lifetime, so the views below are
+    # built once at import and shared: getters return the same immutable
+    # objects instead of copying or regrouping 50 entries per call.
+    _CONSTITUENTS_VIEW = MappingProxyType(NIFTY50_CONSTITUENTS)
+    _SYMBOLS = tuple(NIFTY50_CONSTITUENTS)
+    _SECTORS = _group_by_sector(NIFTY50_CONSTITUENTS)
+
     @classmethod
-    def get_constituents(cls) -> Dict[str, Dict[str, str]]:
-        return cls.NIFTY50_CONSTITUENTS.copy()
+    def get_constituents(cls) -> Mapping[str, Dict[str, str]]:
+        return cls._CONSTITUENTS_VIEW
 
     @classmethod
-    def get_symbols_list(cls) -> List[str]:
-        return list(cls.NIFTY50_CONSTITUENTS.keys())
+    def get_symbols_list(cls) -> Tuple[str, ...]:
+        return cls._SYMBOLS
 
     @classmethod
-    def get_sectors(cls) -> Dict[str, List[str]]:
-        sectors: Dict[str, List[str]] = {}
-        for symbol, info in cls.NIFTY50_CONSTITUENTS.items():
-            sector = info['sector']
-            sectors.setdefault(sector, []).append(symbol)
-        return sectors
+    def get_sectors(cls) -> Mapping[str, Tuple[str, ...]]:
+        return cls._SECTORS
 
 
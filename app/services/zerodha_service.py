@@ -1,17 +1,78 @@
+import os
+import pickle
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Optional
 import logging
 
+import numpy as np
+import orjson
 import pandas as pd
 
 try:
-    from kiteconnect import KiteConnect
+    from kiteconnect import KiteConnect, KiteTicker
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     KITE_AVAILABLE = True
 except Exception:
     KITE_AVAILABLE = False
 
 
+if KITE_AVAILABLE:
+    class _OrjsonResponse(requests.Response):
+        # kiteconnect parses bodies with Response.json(); orjson is several
+        # times faster than stdlib json on the large quote/historical arrays.
+        def json(self, **kwargs):
+            return orjson.loads(self.content)
+
+    class _OrjsonAdapter(HTTPAdapter):
+        def build_response(self, req, resp):
+            response = super().build_response(req, resp)
+            response.__class__ = _OrjsonResponse
+            return response
+
+
+_EMPTY: Dict = {}
+
+# Fixed dtypes for historical bar fields; assembly fills one preallocated
+# array per column instead of letting pandas type-infer per cell.
+_BAR_FIELD_DTYPES = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+}
+
+# On-disk instruments cache: the full exchange dump is a multi-MB download,
+# so restarts within the TTL read it back from disk instead of re-fetching.
+_CACHE_DIR = Path('.cache')
+_INSTRUMENTS_TTL_SECONDS = 3600.0
+
+
+class _RateLimiter:
+    """Hands out evenly spaced call slots so concurrent workers stay under
+    the Kite per-second request limit."""
+
+    def __init__(self, max_per_second: float):
+        self._interval = 1.0 / max_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 class ZerodhaCredentials:
     def __init__(self, api_key: str, api_secret: str, access_token: Optional[str] = None):
         self.api_key = api_key
@@ -26,10 +87,33 @@ class ZerodhaService:
         self.logger = logging.getLogger(__name__ + '.ZerodhaService')
         self.credentials = credentials
         self.kite: Optional[KiteConnect] = KiteConnect(api_key=self.credentials.api_key)
+        # Pooled keep-alive session: consecutive REST calls (instruments,
+        # chunked historical_data, quote) reuse one TLS connection instead of
+        # paying handshake + TCP setup each time. Pool sized above the
+        # concurrent ingest workers.
+        session = requests.Session()
+        session.mount('https://', _OrjsonAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        ))
+        self.kite.reqsession = session
         if self.credentials.access_token:
             self.kite.set_access_token(self.credentials.access_token)
 
-        self._instruments_cache: Dict[str, List[dict]] = {}
+        # cache_key -> (fetched_at, instruments, symbol -> instrument_token)
+        self._instruments_cache: Dict[str, tuple] = {}
+        # Kite allows 3 historical_data requests per second
+        self._historical_rate_limit = _RateLimiter(3.0)
+        # (symbol, exchange) -> token, valid until the next instruments
+        # refresh; repeated lookups skip the cache-entry TTL bookkeeping.
+        self._token_cache: Dict[tuple, int] = {}
+        self._token_cache_deadline = datetime.min
+        # Populated by the websocket ticker when started; fetch_live_quotes
+        # serves from it instead of polling over HTTP.
+        self._live_cache: Dict[str, Dict] = {}
+        self._ticker: Optional[KiteTicker] = None
+        self._ticker_token_symbol: Dict[int, str] = {}
 
     def login_url(self) -> str:
         return self.kite.login_url()
@@ -40,64 +124,231 @@ class ZerodhaService:
         self.kite.set_access_token(self.credentials.access_token)
         return self.credentials.access_token
 
-    def get_instruments(self, exchange: str = 'NSE') -> List[Dict]:
+    def _instruments_entry(self, exchange: str) -> tuple:
         cache_key = f'instruments_{exchange}'
         now = datetime.now()
         cached = self._instruments_cache.get(cache_key)
         if cached and (now - cached[0]) < timedelta(hours=1):
-            return cached[1]
-        instruments = self.kite.instruments(exchange)
-        self._instruments_cache[cache_key] = (now, instruments)
-        return instruments
+            return cached
+        instruments = None
+        disk = self._load_instruments_from_disk(exchange)
+        if disk is not None:
+            # Keep the disk file's age so total staleness stays under the TTL
+            now, instruments = disk
+        if instruments is None:
+            instruments = self.kite.instruments(exchange)
+            self._save_instruments_to_disk(exchange, instruments)
+        # Reverse index built once per refresh; token lookups become one
+        # hash access instead of scanning ~15k instrument dicts per symbol.
+        token_map = {
+            inst['tradingsymbol']: inst['instrument_token']
+            for inst in instruments
+            if inst.get('tradingsymbol')
+        }
+        entry = (now, instruments, token_map)
+        self._instruments_cache[cache_key] = entry
+        self._token_cache.clear()
+        self._token_cache_deadline = now + timedelta(hours=1)
+        return entry
+
+    @staticmethod
+    def _instruments_cache_path(exchange: str) -> Path:
+        return _CACHE_DIR / f'instruments_{exchange}.pkl'
+
+    def _load_instruments_from_disk(self, exchange: str) -> Optional[tuple]:
+        path = self._instruments_cache_path(exchange)
+        try:
+            mtime = path.stat().st_mtime
+            if time.time() - mtime >= _INSTRUMENTS_TTL_SECONDS:
+                return None
+            with path.open('rb') as fh:
+                return datetime.fromtimestamp(mtime), pickle.load(fh)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def _save_instruments_to_disk(self, exchange: str, instruments: List[Dict]):
+        path = self._instruments_cache_path(exchange)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.pkl.tmp')
+            with tmp.open('wb') as fh:
+                pickle.dump(instruments, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            # Atomic swap so a concurrent reader never sees a partial file
+            os.replace(tmp, path)
+        except OSError as exc:
+            self.logger.warning(f'Could not persist instruments cache: {exc}')
+
+    def get_instruments(self, exchange: str = 'NSE') -> List[Dict]:
+        return self._instruments_entry(exchange)[1]
 
     def get_instrument_token(self, symbol: str, exchange: str = 'NSE') -> Optional[int]:
-        instruments = self.get_instruments(exchange)
-        for inst in instruments:
-            if inst.get('tradingsymbol') == symbol:
-                return inst.get('instrument_token')
-        self.logger.warning(f'Instrument token not found for {symbol}')
-        return None
-
-    def fetch_historical_data(self, symbol: str, start_date: datetime, end_date: datetime, interval: str = 'minute') -> pd.DataFrame:
+        if datetime.now() < self._token_cache_deadline:
+            token = self._token_cache.get((symbol, exchange))
+            if token is not None:
+                return token
+        token = self._instruments_entry(exchange)[2].get(symbol)
+        if token is None:
+            self.logger.warning(f'Instrument token not found for {symbol}')
+        else:
+            self._token_cache[(symbol, exchange)] = token
+        return token
+
+    def get_instrument_tokens(self, symbols: List[str], exchange: str = 'NSE') -> Dict[str, Optional[int]]:
+        # Basket resolution: one cache-entry fetch, then a dict-get per symbol
+        token_map = self._instruments_entry(exchange)[2]
+        return {s: token_map.get(s) for s in symbols}
+
+    def fetch_historical_data(self, symbol: str, start_date: datetime, end_date: datetime, interval: str = 'minute',
+                              columns: Optional[List[str]] = None) -> pd.DataFrame:
         token = self.get_instrument_token(symbol)
 
         if not token:
             return pd.DataFrame()
         chunk = timedelta(days=50)
+        windows: List[tuple] = []
         cur = start_date
-        all_rows: List[dict] = []
         while cur < end_date:
             nxt = min(cur + chunk, end_date)
-            rows = self.kite.historical_data(instrument_token=token, from_date=cur, to_date=nxt, interval=interval)
+            windows.append((cur, nxt))
+            cur = nxt + timedelta(days=1)
+
+        def fetch_window(window):
+            # The shared limiter replaces the old unconditional sleep(0.25):
+            # workers overlap network latency but stay under the API limit.
+            self._historical_rate_limit.acquire()
+            w_start, w_end = window
+            return self.kite.historical_data(instrument_token=token, from_date=w_start, to_date=w_end, interval=interval)
+
+        if len(windows) <= 1:
+            results = [fetch_window(w) for w in windows]
+        else:
+            # executor.map preserves window order, keeping rows chronological
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                results = list(executor.map(fetch_window, windows))
+
+        all_rows: List[dict] = []
+        for rows in results:
             if rows:
                 all_rows.extend(rows)
-            time.sleep(0.25)
-            cur = nxt + timedelta(days=1)
         if not all_rows:
             return pd.DataFrame()
-        df = pd.DataFrame(all_rows).rename(columns={'date': 'timestamp'})
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.drop_duplicates(subset=['timestamp']).sort_values('timestamp')
+        # Callers that only need a column subset (e.g. close prices) skip
+        # building and converting the rest. 'timestamp' maps to the API's
+        # 'date' field. Columns are assembled one typed array at a time so
+        # pandas never runs per-cell inference over the row dicts.
+        requested = list(columns) if columns else ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        n = len(all_rows)
+        data = {}
+        for out_col in requested:
+            rec_col = 'date' if out_col == 'timestamp' else out_col
+            if rec_col == 'date':
+                data[out_col] = pd.to_datetime([row['date'] for row in all_rows], cache=True)
+            else:
+                dtype = _BAR_FIELD_DTYPES.get(rec_col, np.float64)
+                data[out_col] = np.fromiter((row[rec_col] for row in all_rows), dtype=dtype, count=n)
+        df = pd.DataFrame(data, copy=False)
+        if 'timestamp' in requested:
+            # Windows are fetched in chronological order, so at most boundary
+            # rows repeat: a single-column duplicated mask replaces the full
+            # drop_duplicates pass, and the sort only runs if the API ever
+            # returns out-of-order rows.
+            df = df[~df['timestamp'].duplicated()]
+            if not df['timestamp'].is_monotonic_increasing:
+                df = df.sort_values('timestamp')
         return df
 
+    def fetch_historical_data_many(self, symbols: List[str], start_date: datetime, end_date: datetime,
+                                   interval: str = 'minute', max_workers: int = 8) -> Dict[str, pd.DataFrame]:
+        """Fetch history for many symbols concurrently.
+
+        Fans the symbol fetches out across a thread pool so their network
+        latency overlaps; the shared token bucket keeps the combined request
+        rate (across symbols and their chunk windows) under the Kite
+        historical limit.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_historical_data, s, start_date, end_date, interval): s
+                for s in symbols
+            }
+            return {futures[f]: f.result() for f in as_completed(futures)}
+
+    def start_ticker(self, symbols: List[str], exchange: str = 'NSE'):
+        """Stream ticks over the Kite websocket into the live cache.
+
+        Once running, fetch_live_quotes reads pushed data instead of paying
+        an HTTP round trip per poll.
+        """
+        if not self.credentials.access_token:
+            raise RuntimeError('Access token required to start the ticker')
+        token_map = self._instruments_entry(exchange)[2]
+        self._ticker_token_symbol = {token_map[s]: s for s in symbols if s in token_map}
+        tokens = list(self._ticker_token_symbol)
+
+        ticker = KiteTicker(self.credentials.api_key, self.credentials.access_token)
+
+        def on_ticks(ws, ticks):
+            for tick in ticks:
+                symbol = self._ticker_token_symbol.get(tick.get('instrument_token'))
+                if not symbol:
+                    continue
+                ohlc = tick.get('ohlc') or _EMPTY
+                self._live_cache[symbol] = {
+                    'open': ohlc.get('open', 0.0),
+                    'high': ohlc.get('high', 0.0),
+                    'low': ohlc.get('low', 0.0),
+                    'close': tick.get('last_price', 0.0),
+                    'volume': tick.get('volume_traded', 0)
+                }
+
+        def on_connect(ws, response):
+            ws.subscribe(tokens)
+            ws.set_mode(ws.MODE_FULL, tokens)
+
+        ticker.on_ticks = on_ticks
+        ticker.on_connect = on_connect
+        ticker.connect(threaded=True)
+        self._ticker = ticker
+
+    def stop_ticker(self):
+        if self._ticker is not None:
+            self._ticker.close()
+            self._ticker = None
+
     def fetch_live_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
         if not self.credentials.access_token:
             return {}
-        instrument_keys: List[str] = []
-        sym_map: Dict[str, str] = {}
-        for s in symbols:
-            instrument_keys.append(f"NSE:{s}")
-            sym_map[f"NSE:{s}"] = s
-        quotes = self.kite.quote(instrument_keys)
+        # Prefer pushed websocket data when the ticker is running; fall back
+        # to the HTTP quote API for symbols with no tick yet.
+        if self._ticker is not None:
+            live = {s: self._live_cache[s] for s in symbols if s in self._live_cache}
+            if len(live) == len(symbols):
+                return live
+        instrument_keys = [f"NSE:{s}" for s in symbols]
+        sym_map = dict(zip(instrument_keys, symbols))
+        # Kite caps quote() at 500 instruments per call; larger universes are
+        # split and the batches fetched concurrently.
+        batches = [instrument_keys[i:i + 500] for i in range(0, len(instrument_keys), 500)]
+        if len(batches) <= 1:
+            quote_batches = [self.kite.quote(b) for b in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                quote_batches = list(executor.map(self.kite.quote, batches))
+        quotes: Dict[str, Dict] = {}
+        for batch in quote_batches:
+            quotes.update(batch)
         live: Dict[str, Dict] = {}
         for key, q in quotes.items():
             s = sym_map.get(key)
             if not s:
                 continue
+            # Bind ohlc once instead of four get('ohlc', {}) round trips
+            # (each of which allocated a throwaway dict on a miss).
+            ohlc = q.get('ohlc') or _EMPTY
             live[s] = {
-                'open': q.get('ohlc', {}).get('open', 0.0),
-                'high': q.get('ohlc', {}).get('high', 0.0),
-                'low': q.get('ohlc', {}).get('low', 0.0),
+                'open': ohlc.get('open', 0.0),
+                'high': ohlc.get('high', 0.0),
+                'low': ohlc.get('low', 0.0),
                 'close': q.get('last_price', 0.0),
                 'volume': q.get('volume', 0)
             }
@@ -1,74 +1,230 @@
+import logging
+import threading
+
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 from typing import List, Tuple
 import holidays
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except Exception:
+    DUCKDB_AVAILABLE = False
+
+# One in-memory connection reused across validation calls; duckdb connections
+# are not safe for concurrent use, hence the lock.
+_duckdb_con = duckdb.connect() if DUCKDB_AVAILABLE else None
+_duckdb_lock = threading.Lock()
+
+
+def _sql_violation_counts(data, volume_min):
+    """Compute all rule-level violation counts in one vectorized SQL pass.
+
+    Returns (high_violations, low_violations, invalid_volume, duplicate_ts).
+    """
+    with _duckdb_lock:
+        _duckdb_con.register('bars', data)
+        try:
+            row = _duckdb_con.execute(
+                "SELECT COALESCE(SUM((high < open OR high < close OR high < low)::INT), 0), "
+                "COALESCE(SUM((low > open OR low > close OR low > high)::INT), 0), "
+                "COALESCE(SUM((volume < ?)::INT), 0), "
+                "COUNT(timestamp) - COUNT(DISTINCT timestamp) "
+                "FROM bars", [volume_min]).fetchone()
+        finally:
+            _duckdb_con.unregister('bars')
+    return tuple(int(c) for c in row)
+
+
+def _scan_ohlcv_loop(open_, high, low, close, volume, volume_min):
+    """Single fused pass over the OHLCV arrays counting integrity violations."""
+    high_violations = 0
+    low_violations = 0
+    invalid_volume = 0
+    for i in range(open_.shape[0]):
+        if high[i] < open_[i] or high[i] < close[i] or high[i] < low[i]:
+            high_violations += 1
+        if low[i] > open_[i] or low[i] > close[i] or low[i] > high[i]:
+            low_violations += 1
+        if volume[i] < volume_min:
+            invalid_volume += 1
+    return high_violations, low_violations, invalid_volume
+
+
+if NUMBA_AVAILABLE:
+    _scan_ohlcv = njit(cache=True)(_scan_ohlcv_loop)
+else:
+    def _scan_ohlcv(open_, high, low, close, volume, volume_min):
+        high_violations = int(np.count_nonzero((high < open_) | (high < close) | (high < low)))
+        low_violations = int(np.count_nonzero((low > open_) | (low > close) | (low > high)))
+        invalid_volume = int(np.count_nonzero(volume < volume_min))
+        return high_violations, low_violations, invalid_volume
+
+
+def _core_scan_loop(open_, high, low, close, volume, volume_min, min_p, max_p):
+    """Fully fused per-row scan: OHLC integrity, per-column price range, and
+    volume violations in one pass, so the price block is read exactly once."""
+    high_violations = 0
+    low_violations = 0
+    invalid_volume = 0
+    out_of_range = np.zeros(4, np.int64)
+    for i in range(open_.shape[0]):
+        o = open_[i]
+        h = high[i]
+        l = low[i]
+        c = close[i]
+        if h < o or h < c or h < l:
+            high_violations += 1
+        if l > o or l > c or l > h:
+            low_violations += 1
+        if volume[i] < volume_min:
+            invalid_volume += 1
+        if o < min_p or o > max_p:
+            out_of_range[0] += 1
+        if h < min_p or h > max_p:
+            out_of_range[1] += 1
+        if l < min_p or l > max_p:
+            out_of_range[2] += 1
+        if c < min_p or c > max_p:
+            out_of_range[3] += 1
+    return high_violations, low_violations, invalid_volume, out_of_range
+
+
+if NUMBA_AVAILABLE:
+    _core_scan = njit(cache=True, fastmath=True)(_core_scan_loop)
+
+
+def _process_gaps_loop(gap_ns, expected_ns, cap):
+    """Numeric core of the gap analysis over int64 nanosecond gaps.
+
+    Counts missing intervals per gap, keeping only reasonable gaps (at most
+    ``cap`` missing intervals each); returns the total and the kept positions.
+    """
+    missing_intervals = 0
+    actual = 0
+    keep = np.empty(gap_ns.shape[0], np.int64)
+    for i in range(gap_ns.shape[0]):
+        gap_missing = gap_ns[i] // expected_ns - 1
+        if gap_missing > 0 and gap_missing <= cap:
+            missing_intervals += gap_missing
+            keep[actual] = i
+            actual += 1
+    return missing_intervals, keep[:actual]
+
+
+if NUMBA_AVAILABLE:
+    _process_gaps = njit(cache=True)(_process_gaps_loop)
+else:
+    def _process_gaps(gap_ns, expected_ns, cap):
+        gap_missing = gap_ns // expected_ns - 1
+        keep = np.flatnonzero((gap_missing > 0) & (gap_missing <= cap))
+        return int(gap_missing[keep].sum()), keep
+
+
+def _time_of_day_ns(t):
+    """Nanoseconds since midnight for a datetime.time."""
+    return (t.hour * 3600 + t.minute * 60 + t.second) * 1_000_000_000
+
+
 class DataValidator:
     def __init__(self, config, validation_rules, logger):
         self.config = config
         self._validation_rules = validation_rules
         self.logger = logger
+        # Holiday-date DatetimeIndex per holiday set, so repeated filter
+        # calls within one validation don't rebuild the index.
+        self._holiday_index_cache = {}
+        # holidays.India calendars per year set: building one walks every
+        # rule for every year, so validations over the same date range
+        # (one per symbol in a batch ingest) reuse a single calendar.
+        self._holiday_cache = {}
+        self._holiday_dates_cache = {}
+
+    def _get_holidays(self, years):
+        key = tuple(sorted(years))
+        if not key:
+            return set()
+        ind_holidays = self._holiday_cache.get(key)
+        if ind_holidays is None:
+            ind_holidays = holidays.India(years=list(key))
+            self._holiday_cache[key] = ind_holidays
+        return ind_holidays
 
     def _log_data_quality_issues(self, symbol: str, issues: List[str], quality_score: float):
         # Implement logging to database or console
-        print(f"🚨 LOGGING METHOD CALLED for {symbol} - THIS SHOULD NOT HAPPEN IN VALIDATION-ONLY MODE!")
-        print(f"🔍 Data quality issues for {symbol}: {issues}, Score: {quality_score}")
         if self.logger:
             self.logger.warning(f"Data quality issues for {symbol}: {issues}, Score: {quality_score}")
 
-    def _is_trading_time(self, timestamp, trading_start, trading_end, ind_holidays):
-        """Check if a timestamp is within trading hours and trading days."""
-        if pd.isna(timestamp):
-            return False
-        
-        # Check if it's a weekend (Saturday=5, Sunday=6)
-        if timestamp.weekday() >= 5:
-            return False
-        
-        # Check if it's a holiday
-        if timestamp.date() in ind_holidays:
-            return False
-        
-        # Check if it's within trading hours
-        time_only = timestamp.time()
-        return trading_start <= time_only <= trading_end
+    def _holiday_index(self, ind_holidays) -> pd.DatetimeIndex:
+        key = tuple(sorted(ind_holidays)) if ind_holidays else ()
+        idx = self._holiday_index_cache.get(key)
+        if idx is None:
+            idx = pd.DatetimeIndex(list(ind_holidays)) if ind_holidays else pd.DatetimeIndex([])
+            self._holiday_index_cache[key] = idx
+        return idx
+
+    def _holiday_dates(self, ind_holidays) -> frozenset:
+        """Plain-date frozenset view of a calendar for hashed membership tests.
+
+        holidays' own __contains__ parses and lazily populates on miss; the
+        frozenset is built once per calendar and hits in O(1).
+        """
+        key = tuple(sorted(ind_holidays)) if ind_holidays else ()
+        dates = self._holiday_dates_cache.get(key)
+        if dates is None:
+            dates = frozenset(ind_holidays)
+            self._holiday_dates_cache[key] = dates
+        return dates
 
     def _get_trading_data_only(self, data, trading_start, trading_end, ind_holidays):
         """Filter data to only include trading hours and trading days."""
         if 'timestamp' not in data.columns:
             return data
-        
-        # Create mask for trading times
-        trading_mask = data['timestamp'].apply(
-            lambda ts: self._is_trading_time(ts, trading_start, trading_end, ind_holidays)
-        )
-        
-        return data[trading_mask].copy()
 
-    def _calculate_expected_trading_intervals(self, data_sorted, trading_start, trading_end, ind_holidays):
-        """Calculate expected intervals only for trading hours and trading days."""
-        if len(data_sorted) < 2:
-            return None, 0
-        
-        # Filter to only trading data
-        trading_data = self._get_trading_data_only(data_sorted, trading_start, trading_end, ind_holidays)
-        
+        # Vectorized replacement for the old per-row apply: weekday/holiday
+        # membership via dt accessors, time-of-day compared as int64
+        # nanoseconds-since-midnight (NaT drops out as int64 min).
+        ts = data['timestamp']
+        wall = ts.dt.tz_localize(None) if isinstance(ts.dtype, pd.DatetimeTZDtype) else ts
+        i8 = wall.to_numpy('datetime64[ns]').view('i8')
+        valid = i8 != np.iinfo(np.int64).min
+        tod_ns = i8 % 86_400_000_000_000
+        in_hours = (tod_ns >= _time_of_day_ns(trading_start)) & (tod_ns <= _time_of_day_ns(trading_end))
+        weekday_ok = (wall.dt.weekday < 5).to_numpy()
+        not_holiday = ~wall.dt.normalize().isin(self._holiday_index(ind_holidays)).to_numpy()
+
+        return data[valid & in_hours & weekday_ok & not_holiday].copy()
+
+    def _calculate_expected_trading_intervals(self, trading_data):
+        """Calculate expected intervals from the pre-filtered trading data."""
         if len(trading_data) < 2:
             return None, 0
-        
+
         # Calculate time differences for trading data only
         time_diffs = trading_data['timestamp'].diff().dropna()
         
         if len(time_diffs) == 0:
             return None, 0
         
-        # Get the most common interval (mode)
-        most_common_interval = time_diffs.mode()
-        if len(most_common_interval) > 0:
-            expected_interval = most_common_interval.iloc[0]
-            return expected_interval, len(trading_data)
-        
+        # Most common interval via bincount on second buckets: O(N + K)
+        # against the sort-and-group inside .mode(). Day-plus gaps are left
+        # out of the histogram so it stays bounded; ties resolve to the
+        # smallest interval, same as mode()'s sorted output.
+        ns = time_diffs.to_numpy('timedelta64[ns]').view('i8')
+        seconds = ns // 1_000_000_000
+        seconds = seconds[(seconds >= 0) & (seconds <= 86_400)]
+        if seconds.size:
+            mode_seconds = int(np.bincount(seconds).argmax())
+            return pd.Timedelta(seconds=mode_seconds), len(trading_data)
+
         return None, 0
 
     def validate_data_quality(self, data: pd.DataFrame, symbol: str = None, skip_logging: bool = False) -> Tuple[bool, List[str], float, dict]:
@@ -77,15 +233,20 @@ class DataValidator:
         if not self.config.get('data_validation_enabled', True):
             return True, [], 1.0, {}
 
-        print(f"🔍 Validating data for {symbol}: {len(data)} rows")
+        self.logger.debug("Validating data for %s: %d rows", symbol, len(data))
         issues = []
-        quality_scores = []
+        # Running sum/count instead of a per-check list; only the mean is used
+        qs_sum = 0.0
+        qs_n = 0
+        # Each category is a DataFrame rather than a list of per-row dicts:
+        # anomalous rows can number in the tens of thousands and a dict per
+        # row costs far more than the underlying column data.
         timestamp_details = {
-            'non_trading_timestamps': [],
-            'non_trading_ohlcv_data': [],
-            'missing_interval_timestamps': [],
-            'gap_details': [],
-            'missing_consecutive_minutes': []
+            'non_trading_timestamps': pd.DataFrame(),
+            'non_trading_ohlcv_data': pd.DataFrame(),
+            'missing_interval_timestamps': pd.DataFrame(),
+            'gap_details': pd.DataFrame(),
+            'missing_consecutive_minutes': pd.DataFrame()
         }
 
         try:
@@ -94,62 +255,105 @@ class DataValidator:
             missing_columns = [col for col in required_columns if col not in data.columns]
             if missing_columns:
                 issues.append(f"Missing columns: {missing_columns}")
-                quality_scores.append(0.0)
+                qs_sum += 0.0
+                qs_n += 1
             else:
-                quality_scores.append(1.0)
+                qs_sum += 1.0
+                qs_n += 1
 
             if data.empty:
                 issues.append("Empty dataset")
                 return False, issues, 0.0
 
+            # Fused numeric scan over contiguous arrays (JIT-compiled when numba
+            # is installed) instead of one boolean Series per comparison. The
+            # numba core also folds the per-column range counts into the same
+            # pass; disable via config['use_numba_validator'] to force the
+            # duckdb/vectorized paths.
+            ohlcv_counts = None
+            duplicate_ts = None
+            range_counts = None
+            if not missing_columns:
+                if NUMBA_AVAILABLE and self.config.get('use_numba_validator', True):
+                    counts = _core_scan(
+                        data['open'].to_numpy(dtype=np.float64),
+                        data['high'].to_numpy(dtype=np.float64),
+                        data['low'].to_numpy(dtype=np.float64),
+                        data['close'].to_numpy(dtype=np.float64),
+                        data['volume'].to_numpy(dtype=np.float64),
+                        float(self._validation_rules['volume_min']),
+                        float(self._validation_rules['price_range']['min']),
+                        float(self._validation_rules['price_range']['max'])
+                    )
+                    ohlcv_counts = counts[:3]
+                    range_counts = counts[3]
+                elif DUCKDB_AVAILABLE:
+                    counts = _sql_violation_counts(data, float(self._validation_rules['volume_min']))
+                    ohlcv_counts = counts[:3]
+                    duplicate_ts = counts[3]
+                else:
+                    ohlcv_counts = _scan_ohlcv(
+                        data['open'].to_numpy(dtype=np.float64),
+                        data['high'].to_numpy(dtype=np.float64),
+                        data['low'].to_numpy(dtype=np.float64),
+                        data['close'].to_numpy(dtype=np.float64),
+                        data['volume'].to_numpy(dtype=np.float64),
+                        float(self._validation_rules['volume_min'])
+                    )
+
             # OHLC logic validation
-            if self._validation_rules['ohlc_logic']:
-                ohlc_violations = 0
-
-                # High >= max(Open, Close, Low)
-                high_violations = (
-                    (data['high'] < data['open']) |
-                    (data['high'] < data['close']) |
-                    (data['high'] < data['low'])
-                ).sum()
-                ohlc_violations += high_violations
-
-                # Low <= min(Open, Close, High)
-                low_violations = (
-                    (data['low'] > data['open']) |
-                    (data['low'] > data['close']) |
-                    (data['low'] > data['high'])
-                ).sum()
-                ohlc_violations += low_violations
+            if self._validation_rules['ohlc_logic'] and ohlcv_counts is not None:
+                # High >= max(Open, Close, Low); Low <= min(Open, Close, High)
+                ohlc_violations = ohlcv_counts[0] + ohlcv_counts[1]
 
                 if ohlc_violations > 0:
                     issues.append(f"OHLC logic violations: {ohlc_violations}")
-                    quality_scores.append(max(0, 1 - (ohlc_violations / len(data))))
+                    qs_sum += max(0, 1 - (ohlc_violations / len(data)))
+                    qs_n += 1
                 else:
-                    quality_scores.append(1.0)
+                    qs_sum += 1.0
+                    qs_n += 1
 
-            # Price range validation
+            # Price range validation: counts come from the fused numba scan
+            # when it ran, otherwise one matrix pass over the price block
             price_cols = ['open', 'high', 'low', 'close']
             price_quality = 1.0
-            for col in price_cols:
-                out_of_range = (
-                    (data[col] < self._validation_rules['price_range']['min']) |
-                    (data[col] > self._validation_rules['price_range']['max'])
-                ).sum()
-
+            if range_counts is None:
+                prices = data[price_cols].to_numpy(dtype=np.float64)
+                range_counts = (
+                    (prices < self._validation_rules['price_range']['min']) |
+                    (prices > self._validation_rules['price_range']['max'])
+                ).sum(axis=0)
+            for col, out_of_range in zip(price_cols, range_counts):
                 if out_of_range > 0:
                     issues.append(f"{col} out of range: {out_of_range} bars")
                     price_quality *= max(0, 1 - (out_of_range / len(data)))
 
-            quality_scores.append(price_quality)
+            qs_sum += price_quality
+            qs_n += 1
 
             # Volume validation
-            negative_volume = (data['volume'] < self._validation_rules['volume_min']).sum()
+            negative_volume = ohlcv_counts[2] if ohlcv_counts is not None else 0
             if negative_volume > 0:
                 issues.append(f"Invalid volume: {negative_volume} bars")
-                quality_scores.append(max(0, 1 - (negative_volume / len(data))))
+                qs_sum += max(0, 1 - (negative_volume / len(data)))
+                qs_n += 1
             else:
-                quality_scores.append(1.0)
+                qs_sum += 1.0
+                qs_n += 1
+
+            # Shared timestamp views: the tz-strip, int64 cast, and year scan
+            # are each a full O(N) pass, so materialize them once here and
+            # reuse them in every branch below (sorting never changes them)
+            years = set()
+            if 'timestamp' in data.columns:
+                wall_all = data['timestamp']
+                if isinstance(wall_all.dtype, pd.DatetimeTZDtype):
+                    wall_all = wall_all.dt.tz_localize(None)
+                wall_i8 = wall_all.to_numpy('datetime64[ns]').view('i8')
+                valid_ts = wall_i8 != np.iinfo(np.int64).min
+                tod_ns = wall_i8 % 86_400_000_000_000
+                years = set(wall_all.dropna().dt.year.unique().tolist())
 
             # Trading hours validation
             if 'timestamp' in data.columns:
@@ -157,134 +361,117 @@ class DataValidator:
                 trading_start = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('start', '09:15:00')).time()
                 trading_end = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('end', '15:29:00')).time()
                 
-                # Check if timestamps are within valid trading hours
-                invalid_hours = 0
-                for timestamp in data['timestamp']:
-                    if pd.notna(timestamp):
-                        # Convert to time only (ignore date)
-                        time_only = timestamp.time()
-                        # Check if outside trading hours
-                        if time_only < trading_start or time_only > trading_end:
-                            invalid_hours += 1
-                
+                # Check if timestamps are within valid trading hours. The
+                # time-of-day compare runs on the shared int64
+                # nanoseconds-since-midnight view instead of one .time()
+                # object per row.
+                start_ns = (trading_start.hour * 3600 + trading_start.minute * 60 + trading_start.second) * 1_000_000_000
+                end_ns = (trading_end.hour * 3600 + trading_end.minute * 60 + trading_end.second) * 1_000_000_000
+                # Clean-feed fast path: when the extreme times already sit
+                # inside the session, no row can be outside it, so skip the
+                # boolean intermediates entirely.
+                tod_valid = tod_ns if valid_ts.all() else tod_ns[valid_ts]
+                if tod_valid.size == 0 or (start_ns <= int(tod_valid.min()) and int(tod_valid.max()) <= end_ns):
+                    invalid_hours = 0
+                else:
+                    invalid_hours = int(((tod_valid < start_ns) | (tod_valid > end_ns)).sum())
+
                 if invalid_hours > 0:
                     issues.append(f"Timestamps outside trading hours ({trading_start.strftime('%H:%M')}-{trading_end.strftime('%H:%M')}): {invalid_hours}")
-                    quality_scores.append(max(0, 1 - (invalid_hours / len(data))))
-                    print(f"🔍 Found {invalid_hours} timestamps outside trading hours in {symbol}")
+                    qs_sum += max(0, 1 - (invalid_hours / len(data)))
+                    qs_n += 1
+                    self.logger.debug("Found %d timestamps outside trading hours in %s", invalid_hours, symbol)
                 else:
-                    quality_scores.append(1.0)
+                    qs_sum += 1.0
+                    qs_n += 1
                 
                 # Holiday and weekend validation
                 if self._validation_rules.get('check_holidays', True):
-                    # Get years from the data to initialize holidays
-                    years = set()
-                    for timestamp in data['timestamp']:
-                        if pd.notna(timestamp):
-                            years.add(timestamp.year)
-                    
                     if years:
                         # Initialize India holidays for the required years
-                        ind_holidays = holidays.India(years=list(years))
-                        
-                        # Check for holidays and weekends
-                        non_trading_days = 0
-                        for idx, row in data.iterrows():
-                            timestamp = row['timestamp']
-                            if pd.notna(timestamp):
-                                # Check if it's a weekend (Saturday=5, Sunday=6)
-                                if timestamp.weekday() >= 5:  # Weekend
-                                    non_trading_days += 1
-                                    timestamp_details['non_trading_timestamps'].append({
-                                        'timestamp': timestamp,
-                                        'reason': 'weekend',
-                                        'day': timestamp.strftime('%A')
-                                    })
-                                    # Capture the actual OHLCV data
-                                    timestamp_details['non_trading_ohlcv_data'].append({
-                                        'timestamp': timestamp,
-                                        'reason': 'weekend',
-                                        'day': timestamp.strftime('%A'),
-                                        'open': row.get('open'),
-                                        'high': row.get('high'),
-                                        'low': row.get('low'),
-                                        'close': row.get('close'),
-                                        'volume': row.get('volume')
-                                    })
-                                # Check if it's a holiday
-                                elif timestamp.date() in ind_holidays:
-                                    non_trading_days += 1
-                                    timestamp_details['non_trading_timestamps'].append({
-                                        'timestamp': timestamp,
-                                        'reason': 'holiday',
-                                        'holiday_name': ind_holidays.get(timestamp.date(), 'Unknown Holiday')
-                                    })
-                                    # Capture the actual OHLCV data
-                                    timestamp_details['non_trading_ohlcv_data'].append({
-                                        'timestamp': timestamp,
-                                        'reason': 'holiday',
-                                        'holiday_name': ind_holidays.get(timestamp.date(), 'Unknown Holiday'),
-                                        'open': row.get('open'),
-                                        'high': row.get('high'),
-                                        'low': row.get('low'),
-                                        'close': row.get('close'),
-                                        'volume': row.get('volume')
-                                    })
-                        
+                        ind_holidays = self._get_holidays(years)
+
+                        # Whole-column weekend/holiday masks instead of the
+                        # old iterrows pass, built on the shared views.
+                        weekend_mask = (wall_all.dt.weekday >= 5) & valid_ts
+                        dates = wall_all.dt.date
+                        holiday_mask = dates.isin(self._holiday_dates(ind_holidays)) & valid_ts & ~weekend_mask
+
+                        detail_cols = [c for c in ('timestamp', 'open', 'high', 'low', 'close', 'volume') if c in data.columns]
+                        non_trading_frames = []
+                        if weekend_mask.any():
+                            wk = data.loc[weekend_mask, detail_cols].copy()
+                            wk['reason'] = 'weekend'
+                            wk['day'] = wk['timestamp'].dt.day_name()
+                            non_trading_frames.append(wk)
+                        if holiday_mask.any():
+                            hd = data.loc[holiday_mask, detail_cols].copy()
+                            hd['reason'] = 'holiday'
+                            hd['holiday_name'] = [ind_holidays.get(d, 'Unknown Holiday') for d in dates[holiday_mask]]
+                            non_trading_frames.append(hd)
+                        if non_trading_frames:
+                            nt = non_trading_frames[0] if len(non_trading_frames) == 1 else pd.concat(non_trading_frames, ignore_index=True)
+                            nt_cols = [c for c in ('timestamp', 'reason', 'day', 'holiday_name') if c in nt.columns]
+                            timestamp_details['non_trading_timestamps'] = nt[nt_cols]
+                            timestamp_details['non_trading_ohlcv_data'] = nt
+
+                        non_trading_days = int(weekend_mask.sum()) + int(holiday_mask.sum())
                         if non_trading_days > 0:
                             issues.append(f"Data on non-trading days (weekends/holidays): {non_trading_days}")
-                            quality_scores.append(max(0, 1 - (non_trading_days / len(data))))
-                            print(f"🔍 Found {non_trading_days} timestamps on non-trading days in {symbol}")
+                            qs_sum += max(0, 1 - (non_trading_days / len(data)))
+                            qs_n += 1
+                            self.logger.debug("Found %d timestamps on non-trading days in %s", non_trading_days, symbol)
                         else:
-                            quality_scores.append(1.0)
+                            qs_sum += 1.0
+                            qs_n += 1
 
             # Time sequence validation and missing timestamp check
             if self._validation_rules['time_sequence'] and len(data) > 1:
                 if 'timestamp' in data.columns:
-                    # Check for missing/null timestamps
-                    null_timestamps = data['timestamp'].isnull().sum()
-                    # Also check for NaT (Not a Time) values
-                    nat_timestamps = pd.isna(data['timestamp']).sum()
-                    total_missing = max(null_timestamps, nat_timestamps)
-                    
+                    # Reuse the shared int64 view: NaT is int64 min,
+                    # duplicates/backward steps fall out of np.diff.
+                    ts_i8 = wall_i8
+                    total_missing = int((~valid_ts).sum())
+
                     if total_missing > 0:
                         issues.append(f"Missing timestamps: {total_missing}")
-                        quality_scores.append(max(0, 1 - (total_missing / len(data))))
+                        qs_sum += max(0, 1 - (total_missing / len(data)))
+                        qs_n += 1
                     else:
-                        quality_scores.append(1.0)
-                    
-                    # Check for time sequence errors (non-increasing timestamps)
-                    data_sorted = data.sort_values('timestamp')
-                    time_errors = (data_sorted['timestamp'].diff() <= timedelta(0)).sum()
+                        qs_sum += 1.0
+                        qs_n += 1
+
+                    # Check for time sequence errors (non-increasing timestamps).
+                    # Data usually arrives sorted; skip the O(N log N) sort and
+                    # frame copy when a monotonic scan confirms it.
+                    if data['timestamp'].is_monotonic_increasing:
+                        data_sorted = data
+                    else:
+                        data_sorted = data.sort_values('timestamp', kind='mergesort')
+                    ts_sorted_i8 = np.sort(ts_i8[ts_i8 != np.iinfo(np.int64).min])
+                    time_errors = int((np.diff(ts_sorted_i8) <= 0).sum()) if ts_sorted_i8.size > 1 else 0
                     if time_errors > 0:
                         issues.append(f"Time sequence errors: {time_errors}")
-                        quality_scores.append(max(0, 1 - (time_errors / len(data))))
+                        qs_sum += max(0, 1 - (time_errors / len(data)))
+                        qs_n += 1
                     else:
-                        quality_scores.append(1.0)
+                        qs_sum += 1.0
+                        qs_n += 1
                     
+                    # Trading-hours frame computed once: the gap check and the
+                    # consecutive-minute check below share it instead of each
+                    # re-running the full mask over data_sorted.
+                    trading_start = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('start', '09:15:00')).time()
+                    trading_end = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('end', '15:29:00')).time()
+                    ind_holidays = self._get_holidays(years)
+                    trading_data = self._get_trading_data_only(data_sorted, trading_start, trading_end, ind_holidays)
+
                     # Check for missing time intervals (gaps in sequence) - ONLY for trading hours and trading days
                     if len(data_sorted) > 1:
-                        # Get trading hours and holidays for validation
-                        trading_start = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('start', '09:15:00')).time()
-                        trading_end = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('end', '15:29:00')).time()
-                        
-                        # Get years from the data to initialize holidays
-                        years = set()
-                        for timestamp in data_sorted['timestamp']:
-                            if pd.notna(timestamp):
-                                years.add(timestamp.year)
-                        
-                        ind_holidays = holidays.India(years=list(years)) if years else set()
-                        
                         # Calculate expected interval based on trading data only
-                        expected_interval, trading_data_count = self._calculate_expected_trading_intervals(
-                            data_sorted, trading_start, trading_end, ind_holidays
-                        )
-                        
+                        expected_interval, trading_data_count = self._calculate_expected_trading_intervals(trading_data)
+
                         if expected_interval and trading_data_count > 1:
-                            # Filter to only trading data for gap analysis
-                            trading_data = self._get_trading_data_only(data_sorted, trading_start, trading_end, ind_holidays)
-                            trading_data = trading_data.sort_values('timestamp')
-                            
                             # Calculate time differences for trading data only
                             time_diffs = trading_data['timestamp'].diff().dropna()
                             
@@ -296,137 +483,144 @@ class DataValidator:
                                 gap_count = large_gaps.sum()
                                 
                                 if gap_count > 0:
-                                    # Calculate how many missing intervals this represents
-                                    missing_intervals = 0
-                                    actual_gap_count = 0
-                                    # Get the actual indices where gaps occur
-                                    gap_indices = time_diffs[large_gaps].index
-                                    gap_values = time_diffs[large_gaps]
-                                    
-                                    for i, (gap_idx, gap) in enumerate(zip(gap_indices, gap_values)):
-                                        if expected_interval.total_seconds() > 0:
-                                            # Calculate missing intervals for this gap
-                                            gap_missing = int((gap.total_seconds() / expected_interval.total_seconds()) - 1)
-                                            # Only count reasonable gaps (not huge gaps that span days/weeks)
-                                            if gap_missing > 0 and gap_missing <= 1000:  # Reasonable limit per gap
-                                                missing_intervals += gap_missing
-                                                actual_gap_count += 1
-                                                
-                                                # Find the actual timestamps for this gap
-                                                gap_start_time = trading_data.iloc[gap_idx]['timestamp']
-                                                gap_end_time = trading_data.iloc[gap_idx + 1]['timestamp']
-                                                
-                                                # Show only actual gaps
-                                                print(f"🔍 GAP {actual_gap_count}: {gap_start_time} → {gap_end_time} (Duration: {int(gap.total_seconds()/60)} min, Missing: {gap_missing} intervals)")
-                                                
-                                                timestamp_details['gap_details'].append({
-                                                    'gap_start': gap_start_time,
-                                                    'gap_end': gap_end_time,
-                                                    'gap_duration_minutes': int(gap.total_seconds() / 60),
-                                                    'missing_intervals': gap_missing,
-                                                    'expected_interval_minutes': int(expected_interval.total_seconds() / 60)
-                                                })
-                                    
+                                    # Numeric core runs over int64 nanosecond
+                                    # arrays (JIT-compiled when numba is
+                                    # installed); only the few kept gaps pay
+                                    # for detail dicts and scalar lookups.
+                                    expected_ns = int(expected_interval.total_seconds() * 1e9)
+                                    gap_positions = np.flatnonzero(large_gaps.to_numpy())
+                                    gap_ns = time_diffs.to_numpy('timedelta64[ns]').view('i8')[gap_positions]
+                                    if expected_ns > 0:
+                                        missing_intervals, kept = _process_gaps(gap_ns, expected_ns, 1000)
+                                        missing_intervals = int(missing_intervals)
+                                    else:
+                                        missing_intervals, kept = 0, np.empty(0, np.int64)
+                                    actual_gap_count = len(kept)
+
+                                    if actual_gap_count > 0:
+                                        # time_diffs position j sits between
+                                        # trading_data rows j and j+1; build
+                                        # the detail frame as whole columns.
+                                        kept_pos = gap_positions[kept]
+                                        ts_arr = trading_data['timestamp'].to_numpy()
+                                        kept_ns = gap_ns[kept]
+                                        gap_frame = pd.DataFrame({
+                                            'gap_start': ts_arr[kept_pos],
+                                            'gap_end': ts_arr[kept_pos + 1],
+                                            'gap_duration_minutes': kept_ns // 60_000_000_000,
+                                            'missing_intervals': kept_ns // expected_ns - 1,
+                                            'expected_interval_minutes': int(expected_interval.total_seconds() / 60)
+                                        })
+                                        timestamp_details['gap_details'] = gap_frame
+
+                                        # Per-gap lines only when debug
+                                        # logging is on; skip the string
+                                        # builds entirely otherwise
+                                        if self.logger.isEnabledFor(logging.DEBUG):
+                                            for n, row in enumerate(gap_frame.itertuples(index=False), start=1):
+                                                self.logger.debug("GAP %d: %s -> %s (Duration: %d min, Missing: %d intervals)", n, row.gap_start, row.gap_end, row.gap_duration_minutes, row.missing_intervals)
+
+
                                     # Cap total missing intervals to a reasonable maximum relative to dataset size
                                     max_reasonable_missing = min(trading_data_count // 2, 10000)  # Max 50% of data or 10k
                                     missing_intervals = min(missing_intervals, max_reasonable_missing)
                                     
                                     if missing_intervals > 0:
                                         issues.append(f"Missing time intervals (trading hours only): {actual_gap_count} gaps detected ({missing_intervals} missing data points)")
-                                        quality_scores.append(max(0, 1 - (actual_gap_count / trading_data_count)))
-                                        print(f"🔍 Found {actual_gap_count} time gaps in {symbol} with {missing_intervals} missing data points (trading hours only)")
+                                        qs_sum += max(0, 1 - (actual_gap_count / trading_data_count))
+                                        qs_n += 1
+                                        self.logger.debug("Found %d time gaps in %s with %d missing data points (trading hours only)", actual_gap_count, symbol, missing_intervals)
                                     else:
                                         # If calculated missing intervals are unreasonable, just report gap count
                                         issues.append(f"Missing time intervals (trading hours only): {actual_gap_count} gaps detected")
-                                        quality_scores.append(max(0, 1 - (actual_gap_count / trading_data_count)))
-                                        print(f"🔍 Found {actual_gap_count} time gaps in {symbol} (missing intervals calculation was unreasonable)")
+                                        qs_sum += max(0, 1 - (actual_gap_count / trading_data_count))
+                                        qs_n += 1
+                                        self.logger.debug("Found %d time gaps in %s (missing intervals calculation was unreasonable)", actual_gap_count, symbol)
                                 else:
-                                    quality_scores.append(1.0)
+                                    qs_sum += 1.0
+                                    qs_n += 1
                             else:
-                                quality_scores.append(1.0)
+                                qs_sum += 1.0
+                                qs_n += 1
                         else:
-                            quality_scores.append(1.0)
+                            qs_sum += 1.0
+                            qs_n += 1
                     
                     # Additional check: For minute-level data, ensure we have consecutive minutes within trading hours and trading days
                     if len(data_sorted) > 1:
                         # Check if this looks like minute-level data
                         sample_diffs = data_sorted['timestamp'].diff().dropna().head(10)
                         if len(sample_diffs) > 0 and sample_diffs.min() <= timedelta(minutes=2):
-                            # This appears to be minute-level data
-                            # Get trading hours and holidays for validation
-                            trading_start = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('start', '09:15:00')).time()
-                            trading_end = pd.Timestamp(self._validation_rules.get('trading_hours', {}).get('end', '15:29:00')).time()
-                            
-                            # Get years from the data to initialize holidays
-                            years = set()
-                            for timestamp in data_sorted['timestamp']:
-                                if pd.notna(timestamp):
-                                    years.add(timestamp.year)
-                            
-                            ind_holidays = holidays.India(years=list(years)) if years else set()
-                            
-                            # Filter to only trading data for consecutive minute analysis
-                            trading_data = self._get_trading_data_only(data_sorted, trading_start, trading_end, ind_holidays)
-                            trading_data = trading_data.sort_values('timestamp')
-                            
+                            # This appears to be minute-level data; reuse the
+                            # shared trading-hours frame from above
                             if len(trading_data) > 1:
-                                consecutive_minutes = 0
-                                for i in range(1, len(trading_data)):
-                                    prev_time = trading_data.iloc[i-1]['timestamp']
-                                    curr_time = trading_data.iloc[i]['timestamp']
-                                    
-                                    # Check if both timestamps are on the same trading day
-                                    if prev_time.date() == curr_time.date():
-                                        # For minute-level data, check if we're missing any minute intervals
-                                        # Allow for seconds within the same minute
-                                        prev_minute = prev_time.replace(second=0, microsecond=0)
-                                        curr_minute = curr_time.replace(second=0, microsecond=0)
-                                        
-                                        expected_next_minute = prev_minute + timedelta(minutes=1)
-                                        
-                                        # If current minute is more than 1 minute ahead, count missing minutes
-                                        if curr_minute > expected_next_minute:
-                                            missing_minutes = int((curr_minute - expected_next_minute).total_seconds() / 60)
-                                            consecutive_minutes += missing_minutes
-                                            
-                                            # Capture the specific missing minute intervals
-                                            for j in range(1, missing_minutes + 1):
-                                                missing_timestamp = expected_next_minute + timedelta(minutes=j-1)
-                                                timestamp_details['missing_consecutive_minutes'].append({
-                                                    'missing_timestamp': missing_timestamp,
-                                                    'prev_timestamp': prev_time,
-                                                    'next_timestamp': curr_time,
-                                                    'gap_duration_minutes': missing_minutes
-                                                })
-                                
+                                # Vectorized pairwise check: floor both sides
+                                # of each gap to the minute and count the
+                                # missing minutes in one diff, then build
+                                # detail rows only for the few gap positions.
+                                ts_seq = trading_data['timestamp'].reset_index(drop=True)
+                                prev = ts_seq.shift(1)
+                                same_day = ts_seq.dt.date == prev.dt.date
+                                prev_min = prev.dt.floor('min')
+                                curr_min = ts_seq.dt.floor('min')
+                                gap_minutes = ((curr_min - prev_min).dt.total_seconds() / 60 - 1)
+                                gap_minutes = gap_minutes.fillna(0).clip(lower=0).astype('int64')
+                                gap_positions = same_day & (gap_minutes > 0)
+                                consecutive_minutes = int(gap_minutes[gap_positions].sum())
+
+                                pos = np.flatnonzero(gap_positions.to_numpy())
+                                if pos.size:
+                                    # Expand each gap into its missing minutes
+                                    # with np.repeat instead of nested loops
+                                    counts = gap_minutes.to_numpy()[pos]
+                                    rep = np.repeat(pos, counts)
+                                    step = np.arange(rep.size) - np.repeat(np.cumsum(counts) - counts, counts)
+                                    # positional take keeps tz-aware dtypes intact
+                                    timestamp_details['missing_consecutive_minutes'] = pd.DataFrame({
+                                        'missing_timestamp': (prev_min.take(rep) + pd.to_timedelta(step + 1, unit='min')).reset_index(drop=True),
+                                        'prev_timestamp': prev.take(rep).reset_index(drop=True),
+                                        'next_timestamp': ts_seq.take(rep).reset_index(drop=True),
+                                        'gap_duration_minutes': np.repeat(counts, counts)
+                                    })
+
                                 if consecutive_minutes > 0:
                                     issues.append(f"Missing consecutive minutes within trading hours: {consecutive_minutes} missing minute intervals")
-                                    quality_scores.append(max(0, 1 - (consecutive_minutes / len(trading_data))))
-                                    print(f"🔍 Found {consecutive_minutes} missing consecutive minute intervals within trading hours in {symbol}")
+                                    qs_sum += max(0, 1 - (consecutive_minutes / len(trading_data)))
+                                    qs_n += 1
+                                    self.logger.debug("Found %d missing consecutive minute intervals within trading hours in %s", consecutive_minutes, symbol)
                                 else:
-                                    quality_scores.append(1.0)
+                                    qs_sum += 1.0
+                                    qs_n += 1
                             else:
-                                quality_scores.append(1.0)
+                                qs_sum += 1.0
+                                qs_n += 1
 
             # Duplicate check
             if self._validation_rules['duplicate_check']:
                 if 'timestamp' in data.columns:
-                    duplicates = data.duplicated(subset=['timestamp']).sum()
+                    ts = data['timestamp']
+                    if duplicate_ts is not None:
+                        duplicates = duplicate_ts
+                    elif ts.is_unique:
+                        # Single uniqueness scan that stops at the first hit;
+                        # duplicated() only runs on the rare dirty frame.
+                        duplicates = 0
+                    else:
+                        duplicates = int(ts.duplicated().sum())
                     if duplicates > 0:
                         issues.append(f"Duplicate timestamps: {duplicates}")
-                        quality_scores.append(max(0, 1 - (duplicates / len(data))))
+                        qs_sum += max(0, 1 - (duplicates / len(data)))
+                        qs_n += 1
                     else:
-                        quality_scores.append(1.0)
+                        qs_sum += 1.0
+                        qs_n += 1
 
             # Calculate overall quality score
-            overall_quality = np.mean(quality_scores) if quality_scores else 0.0
+            overall_quality = qs_sum / qs_n if qs_n else 0.0
 
             # Log quality issues if any (skip logging in validation-only mode)
             if issues and symbol and not skip_logging:
-                print(f"🔍 About to log quality issues for {symbol}, skip_logging={skip_logging}")
                 self._log_data_quality_issues(symbol, issues, overall_quality)
-            elif issues and symbol and skip_logging:
-                print(f"🔍 Skipping quality logging for {symbol} (validation-only mode)")
 
             is_valid = overall_quality >= self._validation_rules['quality_threshold']
 
@@ -1,10 +1,13 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 from kiteconnect import KiteConnect, KiteTicker
 from dotenv import load_dotenv
 
+from app.services.zerodha_service import _RateLimiter
+
 # Load environment variables from a .env file at project root, if present
 load_dotenv()
 
@@ -20,6 +23,12 @@ class ZerodhaConnection:
         self.access_token = os.getenv('ZERODHA_ACCESS_TOKEN')
         if self.access_token:
             self.kite.set_access_token(self.access_token)
+        # Symbol -> token map built from one instruments() download; the
+        # instruments dump only changes daily, so cache it for a trading day.
+        self._instrument_token_cache: Optional[dict] = None
+        self._instruments_fetched_at: Optional[datetime] = None
+        # Kite allows 3 historical-data requests per second across all threads
+        self._historical_rate_limit = _RateLimiter(3.0)
 
     
     def get_login_url(self, redirect_url: str = None) -> str:
@@ -87,15 +96,50 @@ class ZerodhaConnection:
         except Exception as e:
             raise Exception(f"Error fetching historical data: {e}")
 
+    def get_historical_data_batch(self, symbols: List[str], from_date: str, to_date: str,
+                                  interval: str = "day", max_workers: int = 8) -> Dict[str, list]:
+        """
+        Fetch historical data for several symbols concurrently.
+
+        Each fetch blocks on Zerodha's HTTP round-trip, so serial iteration
+        costs N round-trips; a thread pool overlaps the waits while the shared
+        rate limiter keeps the aggregate request rate within Kite's limit.
+        """
+        if not symbols:
+            return {}
+        # Warm the instruments map once so workers don't race to refresh it
+        self.get_instrument_token(symbols[0])
+
+        def fetch(symbol: str):
+            self._historical_rate_limit.acquire()
+            return self.get_historical_data(symbol, from_date, to_date, interval)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, symbol): symbol for symbol in symbols}
+            return {futures[future]: future.result() for future in as_completed(futures)}
+
+    def refresh_instruments(self):
+        """
+        Re-download the instruments list and rebuild the symbol -> token map.
+        """
+        instruments = self.kite.instruments("NSE")
+        self._instrument_token_cache = {
+            instrument['tradingsymbol']: instrument['instrument_token']
+            for instrument in instruments
+        }
+        self._instruments_fetched_at = datetime.now()
+
     def get_instrument_token(self, symbol: str) -> int:
         """
-        Retrieve instrument token from the exchange instruments list.
+        Retrieve instrument token from the cached exchange instruments map.
         """
         try:
-            instruments = self.kite.instruments("NSE")
-            for instrument in instruments:
-                if instrument['tradingsymbol'] == symbol:
-                    return instrument['instrument_token']
-            raise Exception(f"Instrument token not found for {symbol}")
+            if (self._instrument_token_cache is None
+                    or datetime.now() - self._instruments_fetched_at > timedelta(days=1)):
+                self.refresh_instruments()
+            token = self._instrument_token_cache.get(symbol)
+            if token is None:
+                raise Exception(f"Instrument token not found for {symbol}")
+            return token
         except Exception as e:
             raise Exception(f"Error retrieving instrument token: {e}")
@@ -1,21 +1,30 @@
+import logging
 import os
+import sys
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import create_engine
 from alembic import context
 from dotenv import load_dotenv
 
 # Load environment variables from .env
 load_dotenv()
 
-# Import SQLAlchemy Base and ensure models are loaded so metadata includes all tables
+# Import SQLAlchemy Base and ensure models are loaded so metadata includes
+# all tables. Guarded: alembic re-executes env.py for every command, but the
+# model modules only need registering once per process.
 from app.database import Base
-import app.models  # noqa: F401 - imported for side effects (table registration)
+
+if "app.models" not in sys.modules:
+    import app.models  # noqa: F401 - imported for side effects (table registration)
 
 # Alembic Config object
 config = context.config
 
-# Configure logging from alembic.ini
-fileConfig(config.config_file_name)
+# Configure logging from alembic.ini. env.py is re-executed per alembic
+# command, so only parse the ini and install handlers on the first run in
+# this process; repeating fileConfig would stack duplicate handlers.
+if config.config_file_name and not logging.getLogger('alembic').handlers:
+    fileConfig(config.config_file_name)
 
 # Construct DB URL safely using URL encoding for special chars
 from urllib.parse import quote_plus
@@ -31,6 +40,26 @@ DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PO
 # Instead of config.set_main_option, directly pass the URL to create engine
 target_metadata = Base.metadata  # your SQLAlchemy metadata
 
+# Engine is cached at module scope so programmatic alembic runs (e.g. the
+# setup script upgrading then stamping in one process) reuse pooled
+# connections instead of paying a fresh TCP + MySQL handshake per command.
+_engine = None
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            DATABASE_URL,
+            pool_size=int(os.getenv("POOL_SIZE", 5)),
+            max_overflow=int(os.getenv("POOL_MAX_OVERFLOW", 10)),
+            pool_timeout=30,
+            pool_recycle=1800,
+            pool_pre_ping=True,
+            pool_use_lifo=True,
+        )
+    return _engine
+
 def run_migrations_offline():
     url = DATABASE_URL
     context.configure(
@@ -45,11 +74,7 @@ def run_migrations_offline():
 
 
 def run_migrations_online():
-    connectable = engine_from_config(
-        {"sqlalchemy.url": DATABASE_URL},
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = _get_engine()
 
     with connectable.connect() as connection:
         context.configure(
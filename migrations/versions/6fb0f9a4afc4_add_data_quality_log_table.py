@@ -7,7 +7,7 @@ Create Date: 2025-09-12 12:43:00.057347
 """
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -19,15 +19,28 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # Descending keys are only real on MySQL 8.0+; 5.7 parses DESC but builds
+    # ascending indexes, so only emit it where it means something. Offline
+    # (--sql) runs have no live server to probe, so default DESC off there
+    # and keep the generated SQL portable.
+    if context.is_offline_mode():
+        desc = ''
+    else:
+        major = (op.get_bind().execute(sa.text("SELECT VERSION()")).scalar() or "0").split('.', 1)[0]
+        desc = ' DESC' if major.isdigit() and int(major) >= 8 else ''
+
     op.create_table(
         'data_quality_log',
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True, nullable=False),
-        sa.Column('symbol', sa.String(length=20), nullable=True),
+        sa.Column('symbol', sa.String(length=10, collation='ascii_bin'), nullable=True),
         sa.Column('timestamp', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
         sa.Column('quality_score', sa.Float(), nullable=True),
         sa.Column('issues_found', sa.Text(), nullable=True),
         sa.Column('severity', sa.Integer(), nullable=True, server_default=sa.text('1')),
-        sa.Column('resolved', sa.Boolean(), nullable=True, server_default=sa.text('FALSE'))
+        sa.Column('resolved', sa.Boolean(), nullable=True, server_default=sa.text('FALSE')),
+        # Declared with the table so the index is built while it is empty,
+        # instead of a second metadata-lock cycle in a later migration.
+        sa.Index('idx_quality_symbol_timestamp', 'symbol', sa.text(f'timestamp{desc}'))
     )
 
 def downgrade() -> None:
@@ -19,8 +19,12 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # One row per constituent, overwritten on every quote refresh and fully
+    # rebuilt by the next fetch_and_store_live_data pass: a textbook MEMORY
+    # table. Rows never touch disk, so reads and the upsert path are pure
+    # buffer work; losing the contents on restart only costs one refresh.
     op.create_table('live_data_cache',
-        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('symbol', sa.String(length=10, collation='ascii_bin'), nullable=False),
         sa.Column('timestamp', sa.DateTime(), nullable=False),
         sa.Column('open', sa.Float(), nullable=False),
         sa.Column('high', sa.Float(), nullable=False),
@@ -28,7 +32,12 @@ def upgrade() -> None:
         sa.Column('close', sa.Float(), nullable=False),
         sa.Column('volume', sa.Integer(), nullable=False),
         sa.Column('last_updated', sa.DateTime(), nullable=True),
-        sa.PrimaryKeyConstraint('symbol')
+        sa.PrimaryKeyConstraint('symbol'),
+        # Plain ascending BTREE: MEMORY has no descending indexes, and at
+        # ~50 rows direction is irrelevant anyway.
+        sa.Index('idx_live_data_timestamp', 'timestamp'),
+        mysql_engine='MEMORY',
+        mysql_charset='ascii'
     )
 
 
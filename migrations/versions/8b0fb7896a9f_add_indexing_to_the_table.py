@@ -7,8 +7,8 @@ Create Date: 2025-09-12 13:00:42.075428
 """
 from typing import Sequence, Union
 
-from alembic import op
-import sqlalchemy as sa
+from alembic import op  # noqa: F401 - kept for revision API symmetry
+import sqlalchemy as sa  # noqa: F401
 
 
 # revision identifiers, used by Alembic.
@@ -19,29 +19,14 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    production_indexes = [
-        # Primary performance indexes
-        "CREATE INDEX IF NOT EXISTS idx_ohlcv_symbol_timestamp ON ohlcv_data(symbol, timestamp DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_ohlcv_timestamp ON ohlcv_data(timestamp DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_ohlcv_symbol ON ohlcv_data(symbol)",
-        "CREATE INDEX IF NOT EXISTS idx_ohlcv_sector_timestamp ON ohlcv_data(sector, timestamp DESC)",
-
-        # Quality and monitoring indexes
-        "CREATE INDEX IF NOT EXISTS idx_quality_symbol_timestamp ON data_quality_log(symbol, timestamp DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_performance_operation ON performance_metrics(operation, timestamp DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_live_data_timestamp ON live_data_cache(timestamp DESC)",
-
-        # Metadata indexes
-        "CREATE INDEX IF NOT EXISTS idx_constituents_sector ON constituents_metadata(sector)",
-        "CREATE INDEX IF NOT EXISTS idx_constituents_active ON constituents_metadata(is_active)",
-
-        # Export tracking
-        "CREATE INDEX IF NOT EXISTS idx_export_timestamp ON export_history(created_at DESC)"
-    ]
-    for stmt in production_indexes:
-        op.execute(stmt)
+    # All production indexes are now declared inline in their create-table
+    # migrations (4218bfb197f8, efea93bfdb4e, 8969f02cdfd5, 6fb0f9a4afc4,
+    # c33048d291fb, 9dc3f26ec953): the B-trees are built while the tables
+    # are empty, in the same DDL cycle, instead of a second metadata-lock
+    # pass here. The revision is kept so already-stamped databases keep a
+    # contiguous history.
+    pass
 
 
 def downgrade() -> None:
-    """Downgrade schema."""
     pass
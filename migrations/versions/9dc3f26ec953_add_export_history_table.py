@@ -7,7 +7,7 @@ Create Date: 2025-09-12 12:57:40.786789
 """
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -19,6 +19,16 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # Descending keys are only real on MySQL 8.0+; 5.7 parses DESC but builds
+    # ascending indexes, so only emit it where it means something. Offline
+    # (--sql) runs have no live server to probe, so default DESC off there
+    # and keep the generated SQL portable.
+    if context.is_offline_mode():
+        desc = ''
+    else:
+        major = (op.get_bind().execute(sa.text("SELECT VERSION()")).scalar() or "0").split('.', 1)[0]
+        desc = ' DESC' if major.isdigit() and int(major) >= 8 else ''
+
     op.create_table(
         'export_history',
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True, nullable=False),
@@ -29,7 +39,10 @@ def upgrade() -> None:
         sa.Column('format', sa.String(length=20), nullable=True),
         sa.Column('file_path', sa.Text(), nullable=True),
         sa.Column('file_size_mb', sa.Float(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP'))
+        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
+        # Declared with the table so the index is built while it is empty,
+        # instead of a second metadata-lock cycle in a later migration.
+        sa.Index('idx_export_timestamp', sa.text(f'created_at{desc}'))
     )
 
 
@@ -7,7 +7,7 @@ Create Date: 2025-09-12 12:52:06.017718
 """
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -19,17 +19,30 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # Descending keys are only real on MySQL 8.0+; 5.7 parses DESC but builds
+    # ascending indexes, so only emit it where it means something. Offline
+    # (--sql) runs have no live server to probe, so default DESC off there
+    # and keep the generated SQL portable.
+    if context.is_offline_mode():
+        desc = ''
+    else:
+        major = (op.get_bind().execute(sa.text("SELECT VERSION()")).scalar() or "0").split('.', 1)[0]
+        desc = ' DESC' if major.isdigit() and int(major) >= 8 else ''
+
     op.create_table(
         'performance_metrics',
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True, nullable=False),
         sa.Column('timestamp', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
         sa.Column('operation', sa.String(length=100)),
-        sa.Column('symbol', sa.String(length=20)),
+        sa.Column('symbol', sa.String(length=10, collation='ascii_bin')),
         sa.Column('duration_ms', sa.Float()),
         sa.Column('records_affected', sa.Integer()),
         sa.Column('success', sa.Boolean()),
         sa.Column('memory_usage_mb', sa.Float()),
         sa.Column('cache_hit', sa.Boolean()),
+        # Declared with the table so the index is built while it is empty,
+        # instead of a second metadata-lock cycle in a later migration.
+        sa.Index('idx_performance_operation', 'operation', sa.text(f'timestamp{desc}')),
     )
 
 
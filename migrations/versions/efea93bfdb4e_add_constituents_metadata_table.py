@@ -20,7 +20,7 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     op.create_table('constituents_metadata',
-        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('symbol', sa.String(length=10, collation='ascii_bin'), nullable=False),
         sa.Column('company_name', sa.String(length=200), nullable=False),
         sa.Column('sector', sa.String(length=100), nullable=False),
         sa.Column('market_cap_category', sa.String(length=20), nullable=True),
@@ -28,7 +28,11 @@ def upgrade() -> None:
         sa.Column('weightage', sa.Float(), nullable=True),
         sa.Column('added_date', sa.Date(), nullable=True),
         sa.Column('last_updated', sa.DateTime(), nullable=True),
-        sa.PrimaryKeyConstraint('symbol')
+        sa.PrimaryKeyConstraint('symbol'),
+        # Declared with the table so the indexes are built while it is empty,
+        # instead of a second metadata-lock cycle in a later migration.
+        sa.Index('idx_constituents_sector', 'sector'),
+        sa.Index('idx_constituents_active', 'is_active')
     )
 
 
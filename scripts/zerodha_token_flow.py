@@ -1,10 +1,13 @@
 import os
+import shlex
 import sys
+import time
 import webbrowser
 from pathlib import Path
 
 from dotenv import load_dotenv
 from kiteconnect import KiteConnect
+from kiteconnect.exceptions import NetworkException
 
 
 def ensure_env_loaded() -> None:
@@ -23,27 +26,44 @@ def _sanitize(value: str) -> str:
     if value is None:
         return ""
     v = value.strip()
-    if (v.startswith('"') and v.endswith('"')) or (v.startswith("'") and v.endswith("'")):
-        v = v[1:-1].strip()
+    if v and v[0] in "'\"":
+        # shlex applies shell quoting rules in one pass instead of manual
+        # startswith/endswith/slice branches; unquoted values skip it.
+        try:
+            parts = shlex.split(v)
+        except ValueError:
+            # Unbalanced quote: keep the stripped raw value, as before
+            return v
+        return parts[0].strip() if parts else ""
     return v
 
 
+# Built once at import; _looks_like_placeholder is called on every secret
+# check and shouldn't rebuild the set (or re-sanitize) each time. Interned
+# members let the set lookup hit the identity fast path.
+_PLACEHOLDERS = frozenset(map(sys.intern, (
+    "your_key",
+    "your_key_here",
+    "your_api_key",
+    "your_secret",
+    "your_secret_here",
+    "your_api_secret",
+)))
+_MAX_PLACEHOLDER_LEN = max(map(len, _PLACEHOLDERS))
+
+
 def _looks_like_placeholder(value: str) -> bool:
+    """Check an already-sanitized value against the known placeholders."""
     if not value:
         return True
-    v = _sanitize(value).lower()
-    placeholders = {
-        "your_key",
-        "your_key_here",
-        "your_api_key",
-        "your_secret",
-        "your_secret_here",
-        "your_api_secret",
-    }
-    return v in placeholders
-
-
-def get_or_prompt_secret(var_name: str, human_label: str) -> str:
+    # Real secrets are longer than any placeholder; skip the lowercase
+    # allocation for them entirely.
+    if len(value) > _MAX_PLACEHOLDER_LEN:
+        return False
+    return value.lower() in _PLACEHOLDERS
+
+
+def get_or_prompt_secret(var_name: str, human_label: str, pending: dict) -> str:
     current = _sanitize(os.getenv(var_name, ""))
     if _looks_like_placeholder(current):
         print(f"{var_name} is missing or a placeholder.")
@@ -51,41 +71,65 @@ def get_or_prompt_secret(var_name: str, human_label: str) -> str:
         if not entered:
             print(f"No {var_name} provided. Exiting.")
             sys.exit(1)
-        env_path = Path.cwd() / ".env"
-        write_env_value(env_path, var_name, _sanitize(entered))
-        # Reload so downstream reads see the saved value
-        load_dotenv(override=True)
-        return _sanitize(entered)
-    return _sanitize(current)
-
-
-def write_env_value(env_path: Path, key: str, value: str) -> None:
+        # Deferred: collected into `pending` and flushed to .env in one
+        # write_env_values call at the end of the flow.
+        value = _sanitize(entered)
+        pending[var_name] = value
+        return value
+    return current
+
+
+def write_env_values(env_path: Path, mapping: dict) -> None:
+    """Update several KEY=value entries in one read-modify-write.
+
+    The file is read once, all keys are updated in a single pass, and the
+    result lands via a temp file + os.replace so an interrupted run never
+    leaves a half-written .env behind.
+    """
+    if not mapping:
+        return
     lines = []
     if env_path.exists():
         lines = env_path.read_text(encoding="utf-8").splitlines()
 
-    key_prefix = f"{key}="
-    updated = False
+    remaining = dict(mapping)
     for i, line in enumerate(lines):
-        if line.strip().startswith(key_prefix):
-            lines[i] = f"{key}={value}"
-            updated = True
-            break
-
-    if not updated:
+        key = line.strip().split("=", 1)[0]
+        if key in remaining:
+            lines[i] = f"{key}={remaining.pop(key)}"
+            if not remaining:
+                break
+    for key, value in remaining.items():
         lines.append(f"{key}={value}")
 
-    env_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    tmp_path = env_path.with_name(env_path.name + ".tmp")
+    tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp_path, env_path)
+
+
+def write_env_value(env_path: Path, key: str, value: str) -> None:
+    write_env_values(env_path, {key: value})
 
 
 def main() -> None:
     print("Zerodha token helper")
     print("====================")
 
-    # 1) Load env and read API creds
+    # 1) Load env and read API creds. Prompted values accumulate in
+    # pending_env and are flushed in one batched write as soon as both are
+    # collected — before any network step — so an abandoned or failed login
+    # doesn't discard what the user typed.
     ensure_env_loaded()
-    api_key = get_or_prompt_secret("ZERODHA_API_KEY", "ZERODHA_API_KEY (from developer.kite.trade)")
-    api_secret = get_or_prompt_secret("ZERODHA_API_SECRET", "ZERODHA_API_SECRET (from developer.kite.trade)")
+    env_path = Path.cwd() / ".env"
+    pending_env: dict = {}
+    api_key = get_or_prompt_secret("ZERODHA_API_KEY", "ZERODHA_API_KEY (from developer.kite.trade)", pending_env)
+    api_secret = get_or_prompt_secret("ZERODHA_API_SECRET", "ZERODHA_API_SECRET (from developer.kite.trade)", pending_env)
+    if pending_env:
+        write_env_values(env_path, pending_env)
+        # Reload so downstream reads in this process see the saved values
+        load_dotenv(override=True)
+        print(f"Saved {', '.join(pending_env)} to {env_path}")
+        pending_env.clear()
 
 
     # Debug hint if user still faces wrong URL issues
@@ -94,8 +138,9 @@ def main() -> None:
     if _looks_like_placeholder(api_key) or _looks_like_placeholder(api_secret):
         print("Provided API key/secret look invalid. Please re-run and enter real values.")
 
-    # 2) Create login URL and open browser
-    kite = KiteConnect(api_key=api_key)
+    # 2) Create login URL and open browser. The explicit timeout bounds every
+    # HTTP call so a hung Zerodha endpoint can't stall the flow indefinitely.
+    kite = KiteConnect(api_key=api_key, timeout=10)
     login_url = kite.login_url()
     print("\nOpen this URL to login and authorize:")
     print(login_url)
@@ -112,16 +157,26 @@ def main() -> None:
         print("No request_token provided. Exiting.")
         sys.exit(1)
 
-    # 4) Exchange for access_token
+    # 4) Exchange for access_token. Transient network failures get retried
+    # with exponential backoff; auth errors (bad token/secret) raise at once.
     print("\nExchanging request_token for access_token...")
-    session = kite.generate_session(request_token, api_secret=api_secret)
+    for attempt in range(3):
+        try:
+            session = kite.generate_session(request_token, api_secret=api_secret)
+            break
+        except NetworkException as exc:
+            if attempt == 2:
+                raise
+            wait = 2 ** attempt
+            print(f"Network error ({exc}); retrying in {wait}s...")
+            time.sleep(wait)
     access_token = session["access_token"]
     print("\nSUCCESS. Your access_token is:")
     print(access_token)
 
-    # 5) Save to .env in current working directory
-    env_path = Path.cwd() / ".env"
-    write_env_value(env_path, "ZERODHA_ACCESS_TOKEN", access_token)
+    # 5) Save the new access token to .env
+    write_env_values(env_path, {"ZERODHA_ACCESS_TOKEN": access_token})
+    load_dotenv(override=True)
     print(f"\nSaved ZERODHA_ACCESS_TOKEN to {env_path}")
 
     print("\nYou're all set. Restart your app/processes that read .env.")
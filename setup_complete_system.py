@@ -55,10 +55,12 @@ def setup_complete_system():
         # Test core functions with sample data
         print(f"\n🧪 TESTING CORE FUNCTIONS:")
 
+        # One IN-clause query with a window function instead of a DB
+        # round-trip per symbol; matters once this covers all constituents.
         test_symbols = ['RELIANCE', 'TCS', 'HDFCBANK']
+        latest = dm.get_latest_bars_bulk(test_symbols, count=5)
         for symbol in test_symbols:
-            data = dm.get_latest_bars(symbol, count=5)
-            print(f"   {symbol}: {len(data)} bars retrieved")
+            print(f"   {symbol}: {len(latest[symbol])} bars retrieved")
 
         # Sector example (optional)
         # it_stocks = dm.get_sector_data('IT', count=1)